@@ -2,19 +2,29 @@
 """
 Database Backup Script for Capstone Hub
 Creates timestamped backups of the SQLite database
+
+Usage:
+    python backup_database.py                      # incremental snapshot (default)
+    python backup_database.py full                 # standalone full copy
+    python backup_database.py list                 # list full copies and snapshots
+    python backup_database.py restore <id> <path>  # rebuild a snapshot at <path>
 """
 
-import shutil
 import os
 from datetime import datetime
+from src.backup_engine import (
+    online_backup, prune_backups, backup_destination, database_path,
+    create_snapshot, list_snapshots, prune_snapshots, restore_snapshot
+)
+
+STORE_DIR = 'src/database/backups/store'
 
 
 def backup_database():
     """Create timestamped backup of database"""
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    source = 'src/database/app.db'
+    source = str(database_path())
     backup_dir = 'src/database/backups'
-    destination = f'{backup_dir}/app_{timestamp}.db'
+    destination = str(backup_destination(backup_dir))
 
     # Create backups directory if it doesn't exist
     os.makedirs(backup_dir, exist_ok=True)
@@ -24,9 +34,9 @@ def backup_database():
         print(f'❌ Error: Source database not found: {source}')
         return None
 
-    # Copy database
+    # Copy database (online backup API: consistent even while the app writes)
     try:
-        shutil.copy2(source, destination)
+        online_backup(source, destination)
         file_size = os.path.getsize(destination) / 1024  # KB
         print(f'✅ Backup created: {destination} ({file_size:.1f} KB)')
 
@@ -43,21 +53,12 @@ def backup_database():
 def cleanup_old_backups(backup_dir, keep=14):
     """Remove old backups, keeping only the most recent ones"""
     try:
-        backups = sorted([
-            os.path.join(backup_dir, f)
-            for f in os.listdir(backup_dir)
-            if f.startswith('app_') and f.endswith('.db')
-        ])
-
-        if len(backups) > keep:
-            removed_count = 0
-            for old_backup in backups[:-keep]:
-                os.remove(old_backup)
-                removed_count += 1
-                print(f'🗑️  Removed old backup: {os.path.basename(old_backup)}')
-
-            if removed_count > 0:
-                print(f'Kept {keep} most recent backups, removed {removed_count} old backup(s)')
+        removed = prune_backups(backup_dir, keep=keep)
+        for name in removed:
+            print(f'🗑️  Removed old backup: {name}')
+
+        if removed:
+            print(f'Kept {keep} most recent backups, removed {len(removed)} old backup(s)')
 
     except Exception as e:
         print(f'⚠️  Warning: Cleanup failed: {str(e)}')
@@ -90,12 +91,71 @@ def list_backups():
     return backups
 
 
+def snapshot_database():
+    """Add an incremental, deduplicated snapshot to the backup store"""
+    source = str(database_path())
+
+    if not os.path.exists(source):
+        print(f'❌ Error: Source database not found: {source}')
+        return None
+
+    try:
+        manifest = create_snapshot(source, STORE_DIR)
+        size = manifest['size_bytes'] / 1024
+        stored = manifest['new_bytes'] / 1024
+        print(f"✅ Snapshot created: {manifest['snapshot_id']} ({size:.1f} KB database, "
+              f"{manifest['new_chunks']} new chunk(s), {stored:.1f} KB stored)")
+
+        removed, removed_chunks = prune_snapshots(STORE_DIR)
+        for snapshot_id in removed:
+            print(f'🗑️  Removed old snapshot: {snapshot_id}')
+        if removed:
+            print(f'Released {removed_chunks} unreferenced chunk(s)')
+
+        return manifest['snapshot_id']
+
+    except Exception as e:
+        print(f'❌ Snapshot failed: {str(e)}')
+        return None
+
+
+def list_snapshot_backups():
+    """List all snapshots in the backup store"""
+    snapshots = list_snapshots(STORE_DIR)
+
+    if not snapshots:
+        print('No snapshots found')
+        return []
+
+    print(f'\n🧩 Found {len(snapshots)} snapshot(s):')
+    for manifest in reversed(snapshots):
+        size = manifest['size_bytes'] / 1024
+        stored = manifest['new_bytes'] / 1024
+        print(f"  • {manifest['snapshot_id']} ({size:.1f} KB, {stored:.1f} KB new) - {manifest['created_at']}")
+
+    return snapshots
+
+
 if __name__ == '__main__':
     import sys
 
-    if len(sys.argv) > 1 and sys.argv[1] == 'list':
+    command = sys.argv[1] if len(sys.argv) > 1 else 'snapshot'
+
+    if command == 'list':
         list_backups()
-    else:
+        list_snapshot_backups()
+    elif command == 'restore':
+        if len(sys.argv) != 4:
+            print('Usage: python backup_database.py restore <snapshot_id> <destination>')
+            sys.exit(2)
+        try:
+            path = restore_snapshot(sys.argv[2], sys.argv[3], STORE_DIR)
+            print(f'✅ Snapshot {sys.argv[2]} restored to {path}')
+            sys.exit(0)
+        except Exception as e:
+            print(f'❌ Restore failed: {str(e)}')
+            sys.exit(1)
+    elif command == 'full':
         print('🔄 Starting database backup...')
         result = backup_database()
         if result:
@@ -104,3 +164,12 @@ if __name__ == '__main__':
         else:
             print('\n❌ Backup failed')
             sys.exit(1)
+    else:
+        print('🔄 Starting incremental snapshot...')
+        result = snapshot_database()
+        if result:
+            print('\n✅ Snapshot completed successfully')
+            sys.exit(0)
+        else:
+            print('\n❌ Snapshot failed')
+            sys.exit(1)
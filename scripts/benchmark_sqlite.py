@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+SQLite tuning benchmark for the deliverables endpoints
+
+Runs reader and writer processes (like gunicorn workers) against a scratch
+copy of the schema, once per SQLite profile, and compares throughput,
+latency and "database is locked" failures.
+
+Usage: python scripts/benchmark_sqlite.py [--readers 4] [--writers 2] [--seconds 5]
+                                          [--rows 2000] [--profiles off,production]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+STATUSES = ['Not Started', 'In Progress', 'Completed']
+BASE_URL = 'https://localhost'  # the session cookie is Secure-only
+
+
+def _load_app(database_path, profile):
+    """Import the app in this process against the scratch database"""
+    os.environ['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{database_path}'
+    os.environ['SQLITE_PROFILE'] = profile
+    os.environ.setdefault('LOG_LEVEL', 'ERROR')
+    sys.path.insert(0, str(ROOT))
+    from src.main import app
+    from src.extensions import limiter
+    app.config['WTF_CSRF_ENABLED'] = False
+    limiter.enabled = False
+    return app
+
+
+def _seed(database_path, profile, rows):
+    app = _load_app(database_path, profile)
+    from src.models.database import db
+    from src.models.deliverable import Deliverable
+    with app.app_context():
+        db.session.add_all(
+            Deliverable(title=f'Benchmark {i}', description='benchmark row ' * 10,
+                        phase=f'Phase {i % 4 + 1}', status=STATUSES[i % 3])
+            for i in range(rows)
+        )
+        db.session.commit()
+
+
+def _worker(role, database_path, profile, rows, seconds, start_at, results):
+    app = _load_app(database_path, profile)
+    client = app.test_client()
+    if role == 'writer':
+        with client.session_transaction(base_url=BASE_URL) as session:
+            session['authenticated'] = True
+            session['user_role'] = 'admin'
+
+    latencies = []
+    errors = 0
+    locked = 0
+    while time.time() < start_at:
+        time.sleep(0.001)
+    deadline = start_at + seconds
+    while time.time() < deadline:
+        started = time.perf_counter()
+        if role == 'writer':
+            response = client.put(f'/api/deliverables/{random.randint(1, rows)}',
+                                  json={'status': random.choice(STATUSES)}, base_url=BASE_URL)
+        else:
+            response = client.get('/api/deliverables?limit=50&order_by=-updated_at', base_url=BASE_URL)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+            if b'locked' in response.data:
+                locked += 1
+    results.put((role, latencies, errors, locked))
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_profile(profile, args, scratch):
+    database_path = scratch / f'bench_{profile}.db'
+    context = multiprocessing.get_context('spawn')
+
+    seeder = context.Process(target=_seed, args=(database_path, profile, args.rows))
+    seeder.start()
+    seeder.join()
+
+    results = context.Queue()
+    start_at = time.time() + 5  # let every worker finish importing first
+    roles = ['reader'] * args.readers + ['writer'] * args.writers
+    workers = [
+        context.Process(target=_worker,
+                        args=(role, database_path, profile, args.rows, args.seconds, start_at, results))
+        for role in roles
+    ]
+    for worker in workers:
+        worker.start()
+    # A worker that crashed never reports; don't wait on it forever
+    collected = [results.get(timeout=args.seconds + 120) for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    summary = {}
+    for role in ('reader', 'writer'):
+        latencies = [ms for r, values, _, _ in collected if r == role for ms in values]
+        summary[role] = {
+            'requests': len(latencies),
+            'per_second': len(latencies) / args.seconds,
+            'p50_ms': _percentile(latencies, 0.5),
+            'p95_ms': _percentile(latencies, 0.95),
+            'errors': sum(e for r, _, e, _ in collected if r == role),
+            'locked': sum(l for r, _, _, l in collected if r == role),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--profiles', default='off,production')
+    args = parser.parse_args()
+
+    scratch = Path(tempfile.mkdtemp(prefix='sqlite_bench_'))
+    try:
+        print(f"{args.readers} readers (GET /api/deliverables), {args.writers} writers "
+              f"(PUT /api/deliverables/<id>), {args.seconds:g}s, {args.rows} rows\n")
+        print(f"{'profile':<12} {'role':<7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>6} {'locked':>7}")
+        for profile in args.profiles.split(','):
+            summary = run_profile(profile, args, scratch)
+            for role, stats in summary.items():
+                print(f"{profile:<12} {role:<7} {stats['per_second']:>8.1f} {stats['p50_ms']:>8.1f} "
+                      f"{stats['p95_ms']:>8.1f} {stats['errors']:>6} {stats['locked']:>7}")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
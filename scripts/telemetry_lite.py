@@ -2,13 +2,16 @@
 """
 Telemetry Lite - Privacy-Safe Operational Observability
 Records only uptime and error counts (no PII, no tracking)
+
+Logs are streamed line by line and a per-file byte offset checkpoint is kept
+in logs/, so each run only reads what was appended since the last one.
 """
 
 import os
 import sys
 import json
 import sqlite3
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 import re
 
@@ -80,102 +83,261 @@ def check_database_health():
         }
 
 
-def analyze_logs(days=7):
-    """Analyze log files for errors and patterns (privacy-safe)"""
-    log_dir = get_log_dir()
-    error_log = log_dir / 'error.log'
-    app_log = log_dir / 'app.log'
+# Rotated segments kept by the app's RotatingFileHandler (app.log.1 .. .5)
+ROTATED_BACKUPS = 5
 
-    stats = {
-        'error_count': 0,
-        'warning_count': 0,
-        'critical_count': 0,
-        'auth_failures': 0,
-        'rate_limit_hits': 0,
-        'csp_violations': 0,
-        'error_types': {}
-    }
+# Matches text ("2025-01-01 12:00:00") and JSON ("2025-01-01T12:00:00.000+00:00") logs
+TIMESTAMP_PATTERN = re.compile(r'(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}:\d{2})')
+LEVEL_PATTERN = re.compile(r'\[(DEBUG|INFO|WARNING|ERROR|CRITICAL)\]')
+ERROR_TYPE_PATTERN = re.compile(r'([A-Z][a-zA-Z]+Error)')
 
-    # Parse error log
-    if error_log.exists():
-        try:
-            with open(error_log, 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    if '[ERROR]' in line:
-                        stats['error_count'] += 1
-                        # Extract error type (no PII)
-                        match = re.search(r'([A-Z][a-zA-Z]+Error)', line)
-                        if match:
-                            error_type = match.group(1)
-                            stats['error_types'][error_type] = stats['error_types'].get(error_type, 0) + 1
-
-                    elif '[WARNING]' in line:
-                        stats['warning_count'] += 1
-
-                    elif '[CRITICAL]' in line:
-                        stats['critical_count'] += 1
-
-        except Exception as e:
-            stats['log_parse_error'] = str(e)
-
-    # Parse app log for security events
-    if app_log.exists():
-        try:
-            with open(app_log, 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    if 'Authentication required' in line or 'Invalid password' in line:
-                        stats['auth_failures'] += 1
+# Bytes read per step when scanning backwards for the last timestamp
+TAIL_BLOCK = 8192
+TAIL_LIMIT = 1024 * 1024
 
-                    elif '429' in line or 'rate limit' in line.lower():
-                        stats['rate_limit_hits'] += 1
+# Leading bytes remembered per file to detect inode reuse
+FINGERPRINT_BYTES = 64
 
-        except Exception as e:
-            stats['app_log_parse_error'] = str(e)
 
-    # Count CSP violations
-    csp_log = log_dir / 'csp_reports.log'
-    if csp_log.exists():
+def get_checkpoint_path():
+    """Get path to the per-file byte offset checkpoint"""
+    return get_log_dir() / 'telemetry_checkpoint.json'
+
+
+def log_family(name):
+    """Existing segments of a rotated log, oldest first, live file last"""
+    log_dir = get_log_dir()
+    paths = [log_dir / f'{name}.{i}' for i in range(ROTATED_BACKUPS, 0, -1)] + [log_dir / name]
+    return [path for path in paths if path.exists()]
+
+
+def parse_log_line(line):
+    """Return (level, message, fields) for a text or JSON-lines log line"""
+    if line.startswith('{'):
         try:
-            with open(csp_log, 'r', encoding='utf-8', errors='ignore') as f:
-                stats['csp_violations'] = sum(1 for line in f if 'CSPVIOLATION' in line)
-        except:
+            entry = json.loads(line)
+            return entry.get('level'), entry.get('msg', ''), entry
+        except ValueError:
             pass
+    match = LEVEL_PATTERN.search(line)
+    return (match.group(1) if match else None), line, {}
+
+
+def count_error_line(counts, line):
+    level, message, fields = parse_log_line(line)
+    if level == 'ERROR':
+        counts['error_count'] = counts.get('error_count', 0) + 1
+        # Extract error type (no PII)
+        error_type = fields.get('error_class')
+        if not error_type:
+            match = ERROR_TYPE_PATTERN.search(message)
+            error_type = match.group(1) if match else None
+        if error_type:
+            error_types = counts.setdefault('error_types', {})
+            error_types[error_type] = error_types.get(error_type, 0) + 1
+    elif level == 'WARNING':
+        counts['warning_count'] = counts.get('warning_count', 0) + 1
+    elif level == 'CRITICAL':
+        counts['critical_count'] = counts.get('critical_count', 0) + 1
+
+
+def count_app_line(counts, line):
+    counts['lines'] = counts.get('lines', 0) + 1
+    _, message, fields = parse_log_line(line)
+    if 'Authentication required' in message or 'Invalid password' in message:
+        counts['auth_failures'] = counts.get('auth_failures', 0) + 1
+    elif fields:
+        if fields.get('status') == 429 or 'rate limit' in message.lower():
+            counts['rate_limit_hits'] = counts.get('rate_limit_hits', 0) + 1
+    elif '429' in line or 'rate limit' in line.lower():
+        counts['rate_limit_hits'] = counts.get('rate_limit_hits', 0) + 1
+
+
+def count_csp_line(counts, line):
+    if 'CSPVIOLATION' in line:
+        counts['csp_violations'] = counts.get('csp_violations', 0) + 1
+
+
+# log file -> line counter
+LOG_COUNTERS = {
+    'error.log': count_error_line,
+    'app.log': count_app_line,
+    'csp_reports.log': count_csp_line,
+}
+
+
+def load_checkpoint():
+    try:
+        with open(get_checkpoint_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_checkpoint(checkpoint):
+    path = get_checkpoint_path()
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+def _fingerprint(path):
+    with open(path, 'rb') as f:
+        return f.read(FINGERPRINT_BYTES).hex()
+
+
+def scan_file(path, entry, count_line):
+    """Feed complete lines appended since entry['offset'] to count_line.
+
+    entry is updated in place. A file that shrank or whose leading bytes
+    changed is a new file and is counted from the start.
+    """
+    size = path.stat().st_size
+    fingerprint = _fingerprint(path)
+    if size < entry.get('offset', 0) or not fingerprint.startswith(entry.get('fingerprint', '')):
+        entry.clear()
+    entry.setdefault('offset', 0)
+    entry.setdefault('counts', {})
+    if len(entry.get('fingerprint', '')) < len(fingerprint):
+        entry['fingerprint'] = fingerprint
+
+    with open(path, 'rb') as f:
+        f.seek(entry['offset'])
+        for raw in f:
+            if not raw.endswith(b'\n'):
+                break  # partial line still being written; next run picks it up
+            entry['offset'] += len(raw)
+            count_line(entry['counts'], raw.decode('utf-8', errors='ignore'))
+    return entry
+
+
+def _merge_counts(total, counts):
+    for key, value in counts.items():
+        if isinstance(value, dict):
+            merged = total.setdefault(key, {})
+            for name, count in value.items():
+                merged[name] = merged.get(name, 0) + count
+        else:
+            total[key] = total.get(key, 0) + value
+
+
+def scan_logs():
+    """Process bytes appended since the last run; returns totals per log name.
+
+    The checkpoint is keyed by inode, so app.log rotating to app.log.1 keeps
+    its offset and counts, and segments rotated out of the family are dropped.
+    """
+    checkpoint = load_checkpoint()
+    files = checkpoint.get('files', {})
+    live = {}
+    totals = {}
+    errors = {}
+
+    for name, count_line in LOG_COUNTERS.items():
+        totals[name] = {}
+        for path in log_family(name):
+            try:
+                key = str(path.stat().st_ino)
+                entry = scan_file(path, files.get(key, {}), count_line)
+            except OSError as e:
+                errors[name] = str(e)
+                continue
+            entry['path'] = path.name
+            live[key] = entry
+            _merge_counts(totals[name], entry['counts'])
+
+    checkpoint['files'] = live
+    checkpoint['updated_at'] = datetime.now().isoformat()
+    try:
+        save_checkpoint(checkpoint)
+    except OSError as e:
+        errors['checkpoint'] = str(e)
+    return totals, errors
+
+
+def analyze_logs(days=7):
+    """Analyze log files for errors and patterns (privacy-safe)"""
+    totals, errors = scan_logs()
+    error_counts = totals['error.log']
+    app_counts = totals['app.log']
+
+    stats = {
+        'error_count': error_counts.get('error_count', 0),
+        'warning_count': error_counts.get('warning_count', 0),
+        'critical_count': error_counts.get('critical_count', 0),
+        'auth_failures': app_counts.get('auth_failures', 0),
+        'rate_limit_hits': app_counts.get('rate_limit_hits', 0),
+        'csp_violations': totals['csp_reports.log'].get('csp_violations', 0),
+        'error_types': error_counts.get('error_types', {})
+    }
+
+    if 'error.log' in errors:
+        stats['log_parse_error'] = errors['error.log']
+    if 'app.log' in errors:
+        stats['app_log_parse_error'] = errors['app.log']
 
     return stats
 
 
+def _parse_timestamp(line):
+    match = TIMESTAMP_PATTERN.search(line)
+    if not match:
+        return None
+    return datetime.strptime(f'{match.group(1)} {match.group(2)}', '%Y-%m-%d %H:%M:%S')
+
+
+def first_timestamp(path, max_lines=100):
+    """Timestamp of the first timestamped line near the start of the file"""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for _, line in zip(range(max_lines), f):
+            timestamp = _parse_timestamp(line)
+            if timestamp:
+                return timestamp
+    return None
+
+
+def last_timestamp(path):
+    """Timestamp of the last timestamped line, reading backwards from the end"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        tail = b''
+        while position > 0 and len(tail) < TAIL_LIMIT:
+            step = min(TAIL_BLOCK, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+            lines = tail.split(b'\n')
+            # lines[0] may be cut mid-line unless we reached the file start
+            for raw in reversed(lines if position == 0 else lines[1:]):
+                timestamp = _parse_timestamp(raw.decode('utf-8', errors='ignore'))
+                if timestamp:
+                    return timestamp
+    return None
+
+
 def calculate_uptime_estimate():
     """Estimate uptime based on log timestamps (not real-time monitoring)"""
-    log_dir = get_log_dir()
-    app_log = log_dir / 'app.log'
+    segments = log_family('app.log')
 
-    if not app_log.exists():
+    if not segments:
         return {'available': False, 'reason': 'No log file'}
 
     try:
-        # Find first and last log entries
-        with open(app_log, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
+        totals, _ = scan_logs()
+        line_count = totals['app.log'].get('lines', 0)
 
-        if len(lines) < 2:
+        if line_count < 2:
             return {'available': False, 'reason': 'Insufficient log data'}
 
-        # Parse first and last timestamps
-        first_line = lines[0]
-        last_line = lines[-1]
+        # Oldest segment holds the first entry, newest non-empty one the last
+        first_time = next(filter(None, (first_timestamp(path) for path in segments)), None)
+        last_time = next(filter(None, (last_timestamp(path) for path in reversed(segments))), None)
 
-        # Extract timestamp (format: YYYY-MM-DD HH:MM:SS)
-        timestamp_pattern = r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})'
-
-        first_match = re.search(timestamp_pattern, first_line)
-        last_match = re.search(timestamp_pattern, last_line)
-
-        if not first_match or not last_match:
+        if not first_time or not last_time:
             return {'available': False, 'reason': 'Could not parse timestamps'}
 
-        first_time = datetime.strptime(first_match.group(1), '%Y-%m-%d %H:%M:%S')
-        last_time = datetime.strptime(last_match.group(1), '%Y-%m-%d %H:%M:%S')
-
         duration = last_time - first_time
 
         return {
@@ -183,7 +345,7 @@ def calculate_uptime_estimate():
             'first_log': first_time.isoformat(),
             'last_log': last_time.isoformat(),
             'duration_hours': duration.total_seconds() / 3600,
-            'log_lines': len(lines)
+            'log_lines': line_count
         }
 
     except Exception as e:
@@ -196,7 +358,7 @@ def generate_health_summary():
     print(f"{Colors.BOLD}{Colors.BLUE}Capstone Hub - Telemetry Lite Summary{Colors.END}")
     print(f"{Colors.BOLD}{Colors.BLUE}{'='*70}{Colors.END}")
     print(f"Generated: {datetime.now().isoformat()}")
-    print(f"Period: Last 7 days\n")
+    print("Period: Last 7 days\n")
 
     summary = {
         'timestamp': datetime.now().isoformat(),
@@ -212,7 +374,7 @@ def generate_health_summary():
         print(f"  {Colors.GREEN}[OK]{Colors.END} Database accessible")
         print(f"  Tables: {db_health['tables']}")
         if db_health.get('record_counts'):
-            print(f"  Record Counts:")
+            print("  Record Counts:")
             for table, count in db_health['record_counts'].items():
                 print(f"    - {table}: {count}")
     else:
@@ -228,7 +390,7 @@ def generate_health_summary():
     else:
         print(f"  {Colors.YELLOW}[!]{Colors.END} Errors: {log_stats['error_count']}")
         if log_stats['error_types']:
-            print(f"  Error Types:")
+            print("  Error Types:")
             for error_type, count in sorted(log_stats['error_types'].items(), key=lambda x: x[1], reverse=True):
                 print(f"    - {error_type}: {count}")
 
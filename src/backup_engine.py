@@ -0,0 +1,404 @@
+"""
+Online SQLite backups using the sqlite3 backup API
+
+Pages are copied PAGES_PER_STEP at a time from a live database into a
+.part file that is renamed once complete, so a backup is never torn. The
+engine pauses between steps (the source lock is released there) so request
+traffic keeps flowing while a large database is copied. A write from
+another connection restarts an incremental copy from page 0, so after
+MAX_RESTARTS restarts (or BACKUP_MAX_SECONDS) the rest is copied in a single
+step, which holds one read transaction and cannot be restarted.
+
+Snapshots go into a content-addressed store: the consistent image is split
+into page-aligned chunks named by their SHA-256, and only chunks the store
+has not seen before are compressed and written. Each snapshot is a JSON
+manifest listing its chunks, so an unchanged database costs a manifest.
+Writing a snapshot's chunks and manifest, and pruning, hold an exclusive
+lock on the store, so a prune in another process (CLI vs the admin thread)
+cannot delete a chunk that a snapshot in progress is relying on.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from sqlalchemy.engine import make_url
+from src.models.database import db
+
+try:
+    import zstandard
+except ImportError:  # optional; zlib is always available
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:  # Windows; store_lock() uses msvcrt there
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+DATABASE_PATH = Path(__file__).parent / 'database' / 'app.db'
+BACKUP_DIR = Path(__file__).parent / 'database' / 'backups'
+STORE_DIR = BACKUP_DIR / 'store'
+KEEP_BACKUPS = 14
+KEEP_SNAPSHOTS = 30
+
+PAGES_PER_STEP = int(os.environ.get('BACKUP_PAGES_PER_STEP', '256'))
+STEP_PAUSE_SECONDS = float(os.environ.get('BACKUP_STEP_PAUSE_SECONDS', '0.01'))
+# Restarts tolerated before finishing in one step, and the time budget for
+# the incremental phase
+MAX_RESTARTS = int(os.environ.get('BACKUP_MAX_RESTARTS', '3'))
+BACKUP_MAX_SECONDS = float(os.environ.get('BACKUP_MAX_SECONDS', '60'))
+# Database pages per stored chunk (16 x 4 KB pages = 64 KB chunks)
+CHUNK_PAGES = int(os.environ.get('BACKUP_CHUNK_PAGES', '16'))
+
+# One-byte codec tag in front of every stored chunk
+_CODEC_ZLIB = b'Z'
+_CODEC_ZSTD = b'S'
+
+
+class _FinishInOneStep(Exception):
+    """Raised from the progress callback to abandon the incremental copy"""
+
+
+def database_path(uri=None):
+    """File behind an SQLite URL (default: $SQLALCHEMY_DATABASE_URI), else DATABASE_PATH"""
+    uri = uri or os.environ.get('SQLALCHEMY_DATABASE_URI')
+    database = make_url(uri).database if uri else None
+    return Path(database) if database and database != ':memory:' else DATABASE_PATH
+
+
+def backup_destination(backup_dir=BACKUP_DIR, now=None):
+    timestamp = (now or datetime.now()).strftime('%Y%m%d_%H%M%S')
+    return Path(backup_dir) / f'app_{timestamp}.db'
+
+
+def online_backup(source=DATABASE_PATH, destination=None, pages=PAGES_PER_STEP,
+                  pause=STEP_PAUSE_SECONDS, progress=None):
+    """Copy a live database page batch by page batch; returns the backup path.
+
+    progress, if given, is called as progress(pages_copied, pages_total)
+    after every step.
+    """
+    source = Path(source)
+    if not source.exists():
+        raise FileNotFoundError(f'Source database not found: {source}')
+
+    destination = Path(destination or backup_destination())
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    partial = destination.with_name(destination.name + '.part')
+
+    deadline = time.monotonic() + BACKUP_MAX_SECONDS
+    restarts = 0
+    last_copied = 0
+
+    def step(status, remaining, total):
+        nonlocal restarts, last_copied
+        copied = total - remaining
+        if copied < last_copied:
+            restarts += 1
+        last_copied = copied
+        if progress:
+            progress(copied, total)
+        if remaining and (restarts >= MAX_RESTARTS or time.monotonic() >= deadline):
+            raise _FinishInOneStep()
+        if remaining and pause:
+            # The source is unlocked between steps; give writers a turn
+            time.sleep(pause)
+
+    source_conn = sqlite3.connect(source, timeout=30)
+    target_conn = sqlite3.connect(partial)
+    try:
+        try:
+            source_conn.backup(target_conn, pages=pages, progress=step)
+        except _FinishInOneStep:
+            logger.info("Backup of %s restarted %d times; copying the rest in one step", source.name, restarts)
+            source_conn.backup(target_conn, pages=-1)
+            if progress:
+                total = source_conn.execute('PRAGMA page_count').fetchone()[0]
+                progress(total, total)
+    finally:
+        target_conn.close()
+        source_conn.close()
+
+    os.replace(partial, destination)
+    return destination
+
+
+def prune_backups(backup_dir=BACKUP_DIR, keep=KEEP_BACKUPS):
+    """Remove all but the newest `keep` app_*.db backups; returns removed names"""
+    backup_dir = Path(backup_dir)
+    backups = sorted(backup_dir.glob('app_*.db'))
+    removed = []
+    for old_backup in backups[:-keep] if len(backups) > keep else []:
+        old_backup.unlink()
+        removed.append(old_backup.name)
+    return removed
+
+
+def _compress(data):
+    if zstandard is not None:
+        return _CODEC_ZSTD + zstandard.ZstdCompressor(level=3).compress(data)
+    return _CODEC_ZLIB + zlib.compress(data, 6)
+
+
+def _decompress(blob):
+    codec, payload = blob[:1], blob[1:]
+    if codec == _CODEC_ZLIB:
+        return zlib.decompress(payload)
+    if codec == _CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError('Chunk is zstd-compressed but zstandard is not installed')
+        return zstandard.ZstdDecompressor().decompress(payload)
+    raise ValueError(f'Unknown chunk codec {codec!r}')
+
+
+def _chunk_path(store_dir, digest):
+    return Path(store_dir) / 'chunks' / digest[:2] / digest
+
+
+def _manifest_path(store_dir, snapshot_id):
+    return Path(store_dir) / 'manifests' / f'{snapshot_id}.json'
+
+
+def _write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+@contextmanager
+def store_lock(store_dir=STORE_DIR):
+    """Exclusive, blocking lock on the store, across threads and processes"""
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    with open(store_dir / '.lock', 'a+') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            return
+        # msvcrt locks a byte range from the current position; LK_LOCK gives
+        # up after ten one-second retries, so keep waiting like flock does
+        lock_file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                break
+            except OSError:
+                continue
+        try:
+            yield
+        finally:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def new_snapshot_id(now=None):
+    # Microseconds: the CLI and the admin thread may start in the same second
+    return (now or datetime.now()).strftime('%Y%m%d_%H%M%S_%f')
+
+
+def create_snapshot(source=DATABASE_PATH, store_dir=STORE_DIR, snapshot_id=None, progress=None):
+    """Take an online backup and add it to the store; returns the manifest"""
+    store_dir = Path(store_dir)
+    snapshot_id = snapshot_id or new_snapshot_id()
+    if _manifest_path(store_dir, snapshot_id).exists():
+        raise FileExistsError(f'Snapshot {snapshot_id} already exists')
+    image = store_dir / f'{snapshot_id}.{os.getpid()}.image'
+
+    try:
+        online_backup(source, image, progress=progress)
+        conn = sqlite3.connect(image)
+        try:
+            page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        finally:
+            conn.close()
+        chunk_size = page_size * CHUNK_PAGES
+
+        # Held until the manifest references every chunk this snapshot reuses
+        with store_lock(store_dir):
+            chunks = []
+            new_chunks = 0
+            new_bytes = 0
+            with open(image, 'rb') as f:
+                while True:
+                    data = f.read(chunk_size)
+                    if not data:
+                        break
+                    digest = hashlib.sha256(data).hexdigest()
+                    path = _chunk_path(store_dir, digest)
+                    if not path.exists():
+                        blob = _compress(data)
+                        _write_atomic(path, blob)
+                        new_chunks += 1
+                        new_bytes += len(blob)
+                    chunks.append(digest)
+
+            manifest = {
+                'snapshot_id': snapshot_id,
+                'created_at': datetime.utcnow().isoformat(),
+                'size_bytes': image.stat().st_size,
+                'page_size': page_size,
+                'chunk_size': chunk_size,
+                'chunks': chunks,
+                'new_chunks': new_chunks,
+                'new_bytes': new_bytes,
+            }
+            manifest_path = _manifest_path(store_dir, snapshot_id)
+            if manifest_path.exists():
+                raise FileExistsError(f'Snapshot {snapshot_id} already exists')
+            _write_atomic(manifest_path, json.dumps(manifest).encode('utf-8'))
+        return manifest
+    finally:
+        for leftover in (image, image.with_name(image.name + '.part')):
+            if leftover.exists():
+                leftover.unlink()
+
+
+def load_manifest(snapshot_id, store_dir=STORE_DIR):
+    with open(_manifest_path(store_dir, snapshot_id), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def list_snapshots(store_dir=STORE_DIR):
+    """Manifests in the store, oldest first"""
+    manifest_dir = Path(store_dir) / 'manifests'
+    if not manifest_dir.exists():
+        return []
+    return [load_manifest(path.stem, store_dir) for path in sorted(manifest_dir.glob('*.json'))]
+
+
+def restore_snapshot(snapshot_id, destination, store_dir=STORE_DIR, overwrite=False):
+    """Rebuild a snapshot's database file at destination, verifying each chunk"""
+    destination = Path(destination)
+    if destination.exists() and not overwrite:
+        raise FileExistsError(f'Refusing to overwrite {destination}')
+
+    manifest = load_manifest(snapshot_id, store_dir)
+    partial = destination.with_name(destination.name + '.part')
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    with open(partial, 'wb') as f:
+        for digest in manifest['chunks']:
+            with open(_chunk_path(store_dir, digest), 'rb') as chunk:
+                data = _decompress(chunk.read())
+            if hashlib.sha256(data).hexdigest() != digest:
+                partial.unlink()
+                raise ValueError(f'Chunk {digest} is corrupt')
+            f.write(data)
+    os.replace(partial, destination)
+    return destination
+
+
+def prune_snapshots(store_dir=STORE_DIR, keep=KEEP_SNAPSHOTS):
+    """Drop all but the newest `keep` snapshots, then delete unreferenced chunks.
+
+    Returns (removed snapshot ids, removed chunk count).
+    """
+    store_dir = Path(store_dir)
+    with store_lock(store_dir):
+        snapshots = list_snapshots(store_dir)
+        removed = [m['snapshot_id'] for m in snapshots[:-keep]] if len(snapshots) > keep else []
+        for snapshot_id in removed:
+            _manifest_path(store_dir, snapshot_id).unlink()
+
+        live = {digest for m in snapshots[len(removed):] for digest in m['chunks']}
+        removed_chunks = 0
+        chunk_dir = store_dir / 'chunks'
+        if removed and chunk_dir.exists():
+            for path in chunk_dir.glob('*/*'):
+                if path.name not in live and not path.name.endswith('.tmp'):
+                    path.unlink()
+                    removed_chunks += 1
+    return removed, removed_chunks
+
+
+class BackupManager:
+    """Runs one online snapshot at a time on a background thread"""
+
+    def __init__(self, source=DATABASE_PATH, store_dir=STORE_DIR):
+        self.source = source
+        self.store_dir = store_dir
+        self._lock = threading.Lock()
+        self._thread = None
+        self._status = {'status': 'idle'}
+
+    def init_app(self, app):
+        """Back up the file the app's engine is connected to"""
+        with app.app_context():
+            self.source = database_path(str(db.engine.url))
+
+    @property
+    def status(self):
+        with self._lock:
+            status = dict(self._status)
+        total = status.get('pages_total')
+        if total:
+            status['progress'] = round(100 * status['pages_copied'] / total)
+        return status
+
+    def start(self):
+        """Start a backup; returns False if one is already running"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return False
+            snapshot_id = new_snapshot_id()
+            self._status = {
+                'status': 'running',
+                'snapshot_id': snapshot_id,
+                'pages_copied': 0,
+                'pages_total': None,
+                'size_bytes': None,
+                'new_chunks': None,
+                'new_bytes': None,
+                'error': None,
+                'started_at': datetime.utcnow().isoformat(),
+                'finished_at': None,
+            }
+            self._thread = threading.Thread(
+                target=self._run, args=(snapshot_id,), name='db-backup', daemon=True
+            )
+            self._thread.start()
+        return True
+
+    def _progress(self, copied, total):
+        with self._lock:
+            self._status['pages_copied'] = copied
+            self._status['pages_total'] = total
+
+    def _run(self, snapshot_id):
+        update = {}
+        try:
+            manifest = create_snapshot(self.source, self.store_dir, snapshot_id, progress=self._progress)
+            pruned, _ = prune_snapshots(self.store_dir)
+            update = {
+                'status': 'completed',
+                'size_bytes': manifest['size_bytes'],
+                'new_chunks': manifest['new_chunks'],
+                'new_bytes': manifest['new_bytes'],
+                'pruned': pruned,
+            }
+            logger.info("Database snapshot %s created (%d new chunks, %d bytes)",
+                        snapshot_id, manifest['new_chunks'], manifest['new_bytes'])
+        except Exception as e:
+            logger.exception("Database backup failed")
+            update = {'status': 'failed', 'error': str(e)}
+        finally:
+            update['finished_at'] = datetime.utcnow().isoformat()
+            with self._lock:
+                self._status.update(update)
+
+
+backup_manager = BackupManager()
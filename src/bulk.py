@@ -0,0 +1,373 @@
+"""
+Bulk writes for the collection endpoints: /api/<collection>/bulk
+
+POST inserts, PUT updates (every record carries its id) and DELETE removes
+(bare ids or {"id": ...} records). The body is a JSON array or NDJSON
+(application/x-ndjson, one record per line, read incrementally). Records are
+validated and coerced against the model's columns, written with executemany
+in batches of BULK_BATCH_SIZE, and committed in a single transaction.
+
+Invalid records are reported by index (array position or line number) and
+skipped while the rest are written; with ?atomic=true any error rolls back
+the whole request. Core statements bypass the ORM mapper events, so the
+dashboard counters are kept in step through record_rows(); the search index
+triggers fire on their own.
+"""
+
+import json
+import logging
+import os
+from datetime import date, datetime, timezone
+
+from flask import request, jsonify
+from sqlalchemy import bindparam, select
+from sqlalchemy.exc import SQLAlchemyError
+from src.models.database import db
+from src.models.dashboard_aggregate import METRICS, record_rows
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = int(os.environ.get('BULK_BATCH_SIZE', '1000'))
+BULK_MAX_ROWS = int(os.environ.get('BULK_MAX_ROWS', '50000'))
+# Errors listed in a response; the failed count is always exact
+MAX_REPORTED_ERRORS = 100
+
+NDJSON_MIMETYPES = {'application/x-ndjson', 'application/ndjson', 'application/jsonl'}
+BULK_MODES = {'POST': 'create', 'PUT': 'update', 'DELETE': 'delete'}
+# Maintained by the server; never taken from a record
+SERVER_COLUMNS = ('id', 'created_at', 'updated_at')
+
+TRUE_VALUES = {'true', 'yes', 'y', '1', 'on'}
+FALSE_VALUES = {'false', 'no', 'n', '0', 'off'}
+# Accepted besides ISO 8601, for spreadsheet exports
+DATE_FORMATS = ('%m/%d/%Y',)
+
+
+class RowError(ValueError):
+    """A record that cannot be written; reported per row, the rest continue"""
+
+
+class BulkRequestError(ValueError):
+    """The request as a whole is unusable (reported with `status`)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _parse_datetime(value):
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        # Stored naive in UTC, like datetime.utcnow() defaults
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _parse_date(value):
+    try:
+        return _parse_datetime(value).date()
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f'invalid date {value!r}')
+
+
+def coerce_value(column, value):
+    """Convert a JSON or CSV value to the column's Python type.
+
+    Blank strings are NULL for every non-text column.
+    """
+    python_type = column.type.python_type
+    if isinstance(value, str) and python_type is not str:
+        value = value.strip()
+        if value == '':
+            return None
+    if value is None:
+        return None
+
+    if python_type is str:
+        if isinstance(value, (dict, list)):
+            raise ValueError('expected text')
+        return value if isinstance(value, str) else str(value)
+    if python_type is bool:
+        if isinstance(value, bool):
+            return value
+        lowered = str(value).lower()
+        if lowered in TRUE_VALUES:
+            return True
+        if lowered in FALSE_VALUES:
+            return False
+        raise ValueError(f'invalid boolean {value!r}')
+    if python_type is int:
+        if isinstance(value, bool):
+            raise ValueError('expected an integer')
+        if isinstance(value, float):
+            if not value.is_integer():
+                raise ValueError(f'expected an integer, got {value!r}')
+            return int(value)
+        return int(value)
+    if python_type is float:
+        if isinstance(value, bool):
+            raise ValueError('expected a number')
+        return float(value)
+    if python_type is datetime:
+        return value if isinstance(value, datetime) else _parse_datetime(value)
+    if python_type is date:
+        if isinstance(value, datetime):
+            return value.date()
+        return value if isinstance(value, date) else _parse_date(value)
+    return value
+
+
+def _writable_columns(model):
+    return {column.name: column for column in model.__table__.columns if column.name not in SERVER_COLUMNS}
+
+
+def _column_default(column):
+    default = column.default
+    if default is None:
+        return None
+    return default.arg(None) if default.is_callable else default.arg
+
+
+def coerce_record(model, record, partial=False):
+    """Validate one record against the model's columns.
+
+    Returns a complete row (defaults filled in) or, with partial=True, only
+    the columns present. Raises RowError naming every bad field.
+    """
+    if not isinstance(record, dict):
+        raise RowError('expected an object')
+    columns = _writable_columns(model)
+    # id only identifies the row being updated; new rows get theirs from SQLite
+    unknown = [name for name in record if name not in columns and not (partial and name == 'id')]
+    if unknown:
+        raise RowError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+
+    values = {}
+    problems = []
+    for name, column in columns.items():
+        if name in record:
+            try:
+                values[name] = coerce_value(column, record[name])
+            except (TypeError, ValueError) as e:
+                problems.append(f'{name}: {e}')
+                continue
+        elif partial:
+            continue
+        else:
+            values[name] = _column_default(column)
+        if values[name] is None and not column.nullable:
+            problems.append(f'{name} is required')
+    if problems:
+        raise RowError('; '.join(problems))
+    return values
+
+
+def _record_id(record):
+    raw = record.get('id') if isinstance(record, dict) else record
+    if isinstance(raw, bool) or not isinstance(raw, (int, str)):
+        raise RowError('id is required')
+    try:
+        return int(raw)
+    except ValueError:
+        raise RowError(f'invalid id {raw!r}')
+
+
+def _metric_columns(model):
+    return sorted({name for _, columns, _ in METRICS.get(model, ()) for name in columns})
+
+
+def _current_rows(connection, model, ids):
+    """{id: {metric column: value}} for the ids that exist"""
+    table = model.__table__
+    names = _metric_columns(model)
+    query = select(table.c.id, *[table.c[name] for name in names]).where(table.c.id.in_(ids))
+    return {row[0]: dict(zip(names, row[1:])) for row in connection.execute(query)}
+
+
+def _insert(connection, model, records):
+    table = model.__table__
+    rows = [values for _, values in records]
+    result = connection.execute(table.insert().returning(table.c.id, sort_by_parameter_order=True), rows)
+    ids = list(result.scalars())
+    record_rows(connection, model, rows)
+    return ids, []
+
+
+def _update(connection, model, records):
+    table = model.__table__
+    current = _current_rows(connection, model, list({row_id for _, (row_id, _) in records}))
+    now = datetime.utcnow()
+    ids, errors, before, after = [], [], [], []
+    groups = {}  # statements need one key set each
+    for index, (row_id, values) in records:
+        if row_id not in current:
+            errors.append((index, f'{model.__name__} {row_id} not found'))
+            continue
+        previous = current[row_id]
+        merged = {name: values.get(name, value) for name, value in previous.items()}
+        current[row_id] = merged
+        before.append(previous)
+        after.append(merged)
+        params = {**values, 'updated_at': now, 'b_id': row_id}
+        groups.setdefault(tuple(sorted(params)), []).append(params)
+        ids.append(row_id)
+
+    for keys, params in groups.items():
+        statement = table.update().where(table.c.id == bindparam('b_id')).values(
+            {name: bindparam(name) for name in keys if name != 'b_id'}
+        )
+        connection.execute(statement, params)
+    record_rows(connection, model, before, sign=-1)
+    record_rows(connection, model, after)
+    return ids, errors
+
+
+def _delete(connection, model, records):
+    table = model.__table__
+    current = _current_rows(connection, model, list({row_id for _, row_id in records}))
+    ids, errors, seen = [], [], set()
+    for index, row_id in records:
+        if row_id not in current or row_id in seen:
+            errors.append((index, f'{model.__name__} {row_id} not found'))
+        else:
+            ids.append(row_id)
+            seen.add(row_id)
+    if ids:
+        record_rows(connection, model, [current[row_id] for row_id in ids], sign=-1)
+        connection.execute(table.delete().where(table.c.id.in_(ids)))
+    return ids, errors
+
+
+_WRITERS = {'create': _insert, 'update': _update, 'delete': _delete}
+
+
+class BulkWriter:
+    """Coerce records and write them in batches inside the session transaction.
+
+    Each batch runs in a SAVEPOINT; if the database rejects it, the batch is
+    replayed one record at a time so only the offending records fail. The
+    caller commits or rolls back; on_flush(writer), if given, runs after
+    every batch.
+    """
+
+    def __init__(self, model, mode, batch_size=BULK_BATCH_SIZE, on_flush=None):
+        self.model = model
+        self.mode = mode
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        self.batch = []
+        self.ids = []
+        self.errors = []
+        self.failed = 0
+        self.processed = 0
+
+    def add(self, index, record):
+        self.processed += 1
+        try:
+            if self.mode == 'create':
+                prepared = coerce_record(self.model, record)
+            elif self.mode == 'update':
+                prepared = (_record_id(record), coerce_record(self.model, record, partial=True))
+            else:
+                prepared = _record_id(record)
+        except RowError as e:
+            self.add_error(index, str(e))
+            return
+        self.batch.append((index, prepared))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def add_error(self, index, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'index': index, 'error': message})
+
+    def _write(self, records):
+        with db.session.begin_nested():
+            ids, errors = _WRITERS[self.mode](db.session.connection(), self.model, records)
+        self.ids.extend(ids)
+        for index, message in errors:
+            self.add_error(index, message)
+
+    def flush(self):
+        batch, self.batch = self.batch, []
+        if not batch:
+            return
+        try:
+            self._write(batch)
+        except SQLAlchemyError as e:
+            logger.info("Bulk %s batch of %d rejected (%s); retrying per record",
+                        self.mode, len(batch), e.__class__.__name__)
+            for record in batch:
+                try:
+                    self._write([record])
+                except SQLAlchemyError as e:
+                    self.add_error(record[0], str(e.orig if hasattr(e, 'orig') else e))
+        if self.on_flush:
+            self.on_flush(self)
+
+    def summary(self):
+        return {
+            'mode': self.mode,
+            'processed': self.processed,
+            'succeeded': len(self.ids),
+            'failed': self.failed,
+            'ids': self.ids,
+            'errors': self.errors,
+        }
+
+
+def read_records():
+    """Yield (index, record) from a JSON array or NDJSON request body"""
+    if request.mimetype in NDJSON_MIMETYPES:
+        for index, line in enumerate(request.stream):
+            if not line.strip():
+                continue
+            try:
+                yield index, json.loads(line)
+            except ValueError as e:
+                yield index, RowError(f'Invalid JSON: {e}')
+        return
+
+    if not request.is_json:
+        raise BulkRequestError('Send a JSON array or NDJSON (application/x-ndjson)', 415)
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise BulkRequestError('Request body must be a JSON array')
+    yield from enumerate(data)
+
+
+def bulk_response(model):
+    """Handle POST/PUT/DELETE on /api/<collection>/bulk for model"""
+    writer = BulkWriter(model, BULK_MODES[request.method])
+    atomic = request.args.get('atomic', '').lower() in TRUE_VALUES
+    try:
+        for index, record in read_records():
+            if writer.processed >= BULK_MAX_ROWS:
+                raise BulkRequestError(f'At most {BULK_MAX_ROWS} records per request', 413)
+            if isinstance(record, RowError):
+                writer.processed += 1
+                writer.add_error(index, str(record))
+            else:
+                writer.add(index, record)
+        writer.flush()
+    except BulkRequestError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), e.status
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+    summary = writer.summary()
+    if atomic and writer.failed:
+        db.session.rollback()
+        summary.update(succeeded=0, ids=[])
+        return jsonify(summary), 422
+    db.session.commit()
+    return jsonify(summary), 201 if writer.mode == 'create' and writer.ids else 200
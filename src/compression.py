@@ -0,0 +1,94 @@
+"""
+HTTP response compression
+
+Shared gzip/brotli helpers: src/static_assets.py uses them to precompress
+static files once at startup, and init_compression() gzips large JSON API
+responses (buffered or streamed) on the fly for clients that accept it.
+"""
+
+import gzip
+import os
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 11
+DYNAMIC_GZIP_LEVEL = int(os.environ.get('COMPRESS_LEVEL', '6'))
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', '2048'))
+COMPRESSIBLE_MIMETYPES = {'application/json'}
+# Appended to a strong ETag when the body is gzipped: the bytes differ
+GZIP_ETAG_SUFFIX = '-gzip'
+
+
+def supported_encodings():
+    return [encoding for encoding in ENCODING_SUFFIXES if encoding != 'br' or brotli is not None]
+
+
+def compress(data, encoding):
+    """Compress at static (maximum) settings; used for precompression"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=STATIC_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=STATIC_GZIP_LEVEL, mtime=0)
+
+
+def choose_encoding(available):
+    """Best encoding in `available` that the request accepts, or None"""
+    accepted = request.accept_encodings
+    for encoding in ENCODING_SUFFIXES:
+        if encoding in available and accepted[encoding] > 0:
+            return encoding
+    return None
+
+
+def _gzip_stream(chunks, source):
+    compressor = zlib.compressobj(DYNAMIC_GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+    try:
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        if hasattr(source, 'close'):
+            source.close()
+
+
+def compress_response(response):
+    """gzip a JSON response in place when worthwhile and accepted"""
+    if (response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.status_code != 200
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if choose_encoding(('gzip',)) is None:
+        return response
+
+    if response.is_streamed:
+        source = response.response
+        response.response = _gzip_stream(response.iter_encoded(), source)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+        response.set_data(gzip.compress(data, compresslevel=DYNAMIC_GZIP_LEVEL))
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f'{etag}{GZIP_ETAG_SUFFIX}', weak)
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+def init_compression(app):
+    """Register on-the-fly compression of JSON responses"""
+    app.after_request(compress_response)
@@ -0,0 +1,155 @@
+"""
+Background export jobs
+
+A POST enqueues a job on a small thread pool and returns immediately; the
+worker streams the export (see src/exports.py) into EXPORT_DIR. Job status
+lives in a <job_id>.json file next to the artifact, so any app process can
+report progress or serve the download, not only the one that ran the job.
+"""
+
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from sqlalchemy import func, select
+from src.models.database import db
+from src.exports import EXPORT_FORMATS, iter_export, export_filename
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = Path(os.environ.get('EXPORT_DIR', Path(__file__).parent / 'database' / 'exports'))
+EXPORT_WORKERS = int(os.environ.get('EXPORT_WORKERS', '2'))
+JOB_TTL = timedelta(hours=24)
+
+# Status file writes are throttled to this interval while a job runs
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+_JOB_ID = re.compile(r'[0-9a-f]{32}')
+_executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix='export')
+
+
+def _status_path(job_id):
+    return EXPORT_DIR / f'{job_id}.json'
+
+
+def artifact_path(job):
+    return EXPORT_DIR / job['artifact']
+
+
+def read_job(job_id):
+    """Return the job's status dict, or None for unknown/malformed ids"""
+    if not _JOB_ID.fullmatch(job_id or ''):
+        return None
+    try:
+        with open(_status_path(job_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_job(job):
+    """Atomically replace the status file"""
+    path = _status_path(job['job_id'])
+    tmp = path.with_suffix('.json.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(job, f)
+    os.replace(tmp, path)
+
+
+def _purge_expired():
+    """Remove jobs (status + artifact) older than JOB_TTL"""
+    cutoff = time.time() - JOB_TTL.total_seconds()
+    for path in EXPORT_DIR.glob('*.json'):
+        try:
+            if path.stat().st_mtime >= cutoff:
+                continue
+            job = read_job(path.stem)
+            if job:
+                for leftover in (artifact_path(job), artifact_path(job).with_suffix('.part')):
+                    if leftover.exists():
+                        leftover.unlink()
+            path.unlink()
+        except OSError as e:
+            logger.warning("Could not purge export job %s: %s", path.name, e)
+
+
+def submit_job(app, export_format, export_type, types):
+    """Record a queued job and hand it to the pool; returns the status dict"""
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    _purge_expired()
+
+    job_id = uuid.uuid4().hex
+    extension = EXPORT_FORMATS[export_format][1]
+    job = {
+        'job_id': job_id,
+        'status': 'queued',
+        'format': export_format,
+        'type': export_type,
+        'artifact': f'{job_id}.{extension}',
+        'download_name': export_filename(export_format),
+        'rows_total': None,
+        'rows_written': 0,
+        'size_bytes': None,
+        'error': None,
+        'created_at': datetime.utcnow().isoformat(),
+        'started_at': None,
+        'finished_at': None,
+    }
+    _write_job(job)
+    _executor.submit(_run_job, app, dict(job), types)
+    return job
+
+
+def _run_job(app, job, types):
+    with app.app_context():
+        try:
+            job['status'] = 'running'
+            job['started_at'] = datetime.utcnow().isoformat()
+            job['rows_total'] = sum(
+                db.session.execute(select(func.count()).select_from(model.__table__)).scalar()
+                for _, model in types
+            )
+            _write_job(job)
+
+            last_report = time.monotonic()
+
+            def progress(rows):
+                nonlocal last_report
+                job['rows_written'] = rows
+                if time.monotonic() - last_report >= PROGRESS_INTERVAL_SECONDS:
+                    last_report = time.monotonic()
+                    _write_job(job)
+
+            target = artifact_path(job)
+            partial = target.with_suffix('.part')
+            with open(partial, 'wb') as f:
+                for chunk in iter_export(job['format'], types, progress):
+                    f.write(chunk)
+            os.replace(partial, target)
+
+            job['status'] = 'completed'
+            job['size_bytes'] = target.stat().st_size
+        except Exception as e:
+            logger.exception("Export job %s failed", job['job_id'])
+            job['status'] = 'failed'
+            job['error'] = str(e)
+        finally:
+            job['finished_at'] = datetime.utcnow().isoformat()
+            _write_job(job)
+            db.session.remove()
+
+
+def public_view(job):
+    """Status fields exposed to clients (omits on-disk names)"""
+    view = {key: value for key, value in job.items() if key != 'artifact'}
+    total = job.get('rows_total')
+    view['progress'] = (
+        100 if job['status'] == 'completed'
+        else round(100 * job['rows_written'] / total) if total else 0
+    )
+    return view
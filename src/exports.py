@@ -0,0 +1,167 @@
+"""
+Streaming data export (JSON or a ZIP of CSVs) built from live tables
+
+Rows are read with yield_per and written straight into the output format;
+the generators yield byte chunks as soon as roughly CHUNK_SIZE bytes are
+ready, so memory stays flat however many rows are exported.
+"""
+
+import csv
+import io
+import json
+import zipfile
+from datetime import date, datetime
+from sqlalchemy import select
+from src.models.database import db
+from src.models.deliverable import Deliverable
+from src.models.business_process import BusinessProcess
+from src.models.ai_technology import AITechnology
+from src.models.software_tool import SoftwareTool
+from src.models.research_item import ResearchItem
+from src.models.integration import Integration
+
+# Export type -> model; 'all' exports every one of them
+EXPORT_TYPES = {
+    'deliverables': Deliverable,
+    'processes': BusinessProcess,
+    'technologies': AITechnology,
+    'tools': SoftwareTool,
+    'research': ResearchItem,
+    'integrations': Integration,
+}
+
+EXPORT_FORMATS = {
+    'json': ('application/json', 'json'),
+    'csv': ('application/zip', 'zip'),
+}
+
+CHUNK_SIZE = 64 * 1024
+FETCH_SIZE = 1000
+
+
+class _ChunkSink:
+    """Write-only, unseekable file object that buffers bytes until drained"""
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+
+class _Progress:
+    """Counts exported rows and reports every FETCH_SIZE rows"""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.rows = 0
+
+    def tick(self):
+        self.rows += 1
+        if self.callback and self.rows % FETCH_SIZE == 0:
+            self.callback(self.rows)
+
+    def finish(self):
+        if self.callback:
+            self.callback(self.rows)
+
+
+def resolve_types(export_type):
+    """Map the request's type to [(name, model)], or None if unknown"""
+    if export_type == 'all':
+        return list(EXPORT_TYPES.items())
+    if export_type in EXPORT_TYPES:
+        return [(export_type, EXPORT_TYPES[export_type])]
+    return None
+
+
+def _cell(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def iter_rows(model):
+    """Return (column names, result streaming FETCH_SIZE rows at a time)"""
+    table = model.__table__
+    result = db.session.execute(
+        select(table).order_by(table.c.id).execution_options(yield_per=FETCH_SIZE)
+    )
+    return table.columns.keys(), result
+
+
+def iter_json(types, progress=None):
+    """Yield a JSON object {type: [rows...]} in chunks"""
+    counter = _Progress(progress)
+    buffer = io.StringIO()
+    buffer.write('{')
+    for index, (name, model) in enumerate(types):
+        columns, rows = iter_rows(model)
+        buffer.write(('' if index == 0 else ',') + json.dumps(name) + ':[')
+        first = True
+        for row in rows:
+            if not first:
+                buffer.write(',')
+            first = False
+            buffer.write(json.dumps({column: _cell(value) for column, value in zip(columns, row)}))
+            counter.tick()
+            if buffer.tell() >= CHUNK_SIZE:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        buffer.write(']')
+    buffer.write('}')
+    yield buffer.getvalue().encode('utf-8')
+    counter.finish()
+
+
+def iter_csv_zip(types, progress=None):
+    """Yield a ZIP archive holding one CSV per type, in chunks"""
+    counter = _Progress(progress)
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, model in types:
+            columns, rows = iter_rows(model)
+            # force_zip64: the member size is unknown until the stream ends
+            with archive.open(f'{name}.csv', 'w', force_zip64=True) as member:
+                text = io.TextIOWrapper(member, encoding='utf-8', newline='')
+                writer = csv.writer(text)
+                writer.writerow(columns)
+                for row in rows:
+                    writer.writerow([_cell(value) for value in row])
+                    counter.tick()
+                    if sink.size >= CHUNK_SIZE:
+                        yield sink.drain()
+                text.flush()
+                text.detach()
+            if sink.size:
+                yield sink.drain()
+    yield sink.drain()
+    counter.finish()
+
+
+def iter_export(export_format, types, progress=None):
+    """Byte-chunk generator for the given format ('json' or 'csv').
+
+    progress, if given, is called with the running row count.
+    """
+    if export_format == 'json':
+        return iter_json(types, progress)
+    return iter_csv_zip(types, progress)
+
+
+def export_filename(export_format, now=None):
+    extension = EXPORT_FORMATS[export_format][1]
+    return f'capstone_data_{(now or datetime.now()).strftime("%Y%m%d")}.{extension}'
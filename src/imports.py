@@ -0,0 +1,248 @@
+"""
+Background CSV/XLSX imports into one entity table
+
+The upload is spooled to IMPORT_DIR and a worker streams it row by row: CSV
+through csv.reader, XLSX through openpyxl's read-only mode (pinned in
+requirements.txt; without it only CSV is accepted). Each row is coerced
+against the model's columns by src/bulk.py and written with executemany in
+batches of IMPORT_BATCH_SIZE, committed per batch so progress is durable and other writers are never
+blocked for long. Like export jobs, status lives in <job_id>.json so any
+app process can report progress and the per-row errors, which carry the
+spreadsheet row number (the header is row 1) as their index.
+
+init_imports(app) must run before csrf.init_app(app): CSRFProtect reads the
+form on every POST, so the upload size limit has to be in place before then.
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from flask import jsonify, request
+from werkzeug.utils import secure_filename
+from src.models.database import db
+from src.bulk import SERVER_COLUMNS, BulkWriter
+from src.exports import EXPORT_TYPES
+
+try:
+    import openpyxl
+except ImportError:  # CSV imports still work without it
+    openpyxl = None
+
+logger = logging.getLogger(__name__)
+
+IMPORT_DIR = Path(os.environ.get('IMPORT_DIR', Path(__file__).parent / 'database' / 'imports'))
+IMPORT_WORKERS = int(os.environ.get('IMPORT_WORKERS', '1'))
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '1000'))
+IMPORT_MAX_BYTES = int(os.environ.get('IMPORT_MAX_BYTES', str(100 * 1024 * 1024)))
+JOB_TTL = timedelta(hours=24)
+
+# Same type names as exports, so an exported CSV imports back unchanged
+IMPORT_TYPES = EXPORT_TYPES
+
+# Status file writes are throttled to this interval while a job runs
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+_JOB_ID = re.compile(r'[0-9a-f]{32}')
+_executor = ThreadPoolExecutor(max_workers=IMPORT_WORKERS, thread_name_prefix='import')
+
+
+def import_formats():
+    """File extensions that can be imported here"""
+    return ['csv'] + (['xlsx'] if openpyxl is not None else [])
+
+
+def import_format(filename):
+    """'csv' or 'xlsx' from the file name, or None if unsupported"""
+    extension = Path(filename or '').suffix.lower().lstrip('.')
+    return extension if extension in import_formats() else None
+
+
+def init_imports(app, endpoint='advanced_features.create_import_job'):
+    """Cap upload size on the import endpoint before anything parses the body"""
+
+    @app.before_request
+    def limit_import_upload():
+        if request.endpoint != endpoint:
+            return None
+        # Also enforced while reading a body sent without Content-Length
+        request.max_content_length = IMPORT_MAX_BYTES
+        if request.content_length is not None and request.content_length > IMPORT_MAX_BYTES:
+            return jsonify({'error': f'Uploads are limited to {IMPORT_MAX_BYTES} bytes'}), 413
+        return None
+
+
+def _status_path(job_id):
+    return IMPORT_DIR / f'{job_id}.json'
+
+
+def _upload_path(job):
+    return IMPORT_DIR / f"{job['job_id']}.{job['format']}"
+
+
+def read_job(job_id):
+    """Return the job's status dict, or None for unknown/malformed ids"""
+    if not _JOB_ID.fullmatch(job_id or ''):
+        return None
+    try:
+        with open(_status_path(job_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_job(job):
+    """Atomically replace the status file"""
+    path = _status_path(job['job_id'])
+    tmp = path.with_suffix('.json.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(job, f)
+    os.replace(tmp, path)
+
+
+def _purge_expired():
+    """Remove job status files (and stray uploads) older than JOB_TTL"""
+    cutoff = time.time() - JOB_TTL.total_seconds()
+    for path in IMPORT_DIR.iterdir():
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError as e:
+            logger.warning("Could not purge import file %s: %s", path.name, e)
+
+
+def _column_name(header):
+    """'Due Date' / 'due-date' -> 'due_date'"""
+    return re.sub(r'[\s\-]+', '_', str(header or '').strip().lower())
+
+
+def _csv_rows(path):
+    """Yield (row number, cells, fraction of the file read); row 1 is the header"""
+    size = os.path.getsize(path) or 1
+    with open(path, 'rb') as raw:
+        # utf-8-sig drops the BOM that spreadsheet "Save as CSV" adds
+        text = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+        reader = csv.reader(text)
+        for cells in reader:
+            yield reader.line_num, cells, raw.tell() / size
+
+
+def _xlsx_rows(path):
+    """Yield (row number, cells, fraction read) from the first worksheet"""
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        total = sheet.max_row or 0
+        for number, cells in enumerate(sheet.iter_rows(values_only=True), start=1):
+            yield number, cells, number / total if total else 0.0
+    finally:
+        workbook.close()
+
+
+_READERS = {'csv': _csv_rows, 'xlsx': _xlsx_rows}
+
+
+def submit_import(app, upload, import_type, file_format):
+    """Save the upload, record a queued job and hand it to the pool"""
+    IMPORT_DIR.mkdir(parents=True, exist_ok=True)
+    _purge_expired()
+
+    job = {
+        'job_id': uuid.uuid4().hex,
+        'status': 'queued',
+        'type': import_type,
+        'format': file_format,
+        'filename': secure_filename(upload.filename),
+        'size_bytes': None,
+        'rows_processed': 0,
+        'rows_imported': 0,
+        'rows_failed': 0,
+        'progress': 0,
+        'ignored_columns': [],
+        'errors': [],
+        'error': None,
+        'created_at': datetime.utcnow().isoformat(),
+        'started_at': None,
+        'finished_at': None,
+    }
+    # Copied in chunks; large uploads were already spooled to a temp file
+    upload.save(_upload_path(job))
+    job['size_bytes'] = _upload_path(job).stat().st_size
+    _write_job(job)
+    _executor.submit(_run_job, app, dict(job))
+    return job
+
+
+def _run_job(app, job):
+    with app.app_context():
+        try:
+            job['status'] = 'running'
+            job['started_at'] = datetime.utcnow().isoformat()
+            _write_job(job)
+            _import(job, IMPORT_TYPES[job['type']])
+            job['status'] = 'completed'
+            job['progress'] = 100
+        except Exception as e:
+            logger.exception("Import job %s failed", job['job_id'])
+            db.session.rollback()
+            job['status'] = 'failed'
+            job['error'] = str(e)
+        finally:
+            job['finished_at'] = datetime.utcnow().isoformat()
+            _write_job(job)
+            db.session.remove()
+            _upload_path(job).unlink(missing_ok=True)
+
+
+def _import(job, model):
+    rows = _READERS[job['format']](_upload_path(job))
+    header = next(rows, None)
+    if header is None:
+        raise ValueError('The file is empty')
+
+    writable = {column.name for column in model.__table__.columns}
+    columns = []
+    for cell in header[1]:
+        name = _column_name(cell)
+        if name in writable and name not in SERVER_COLUMNS:
+            columns.append(name)
+        else:
+            columns.append(None)
+            if name and name not in SERVER_COLUMNS:
+                job['ignored_columns'].append(str(cell))
+
+    fraction = 0.0
+    last_report = time.monotonic()
+
+    def report(writer):
+        """Commit the batch just written and publish progress (throttled)"""
+        nonlocal last_report
+        db.session.commit()
+        job['rows_processed'] = writer.processed
+        job['rows_imported'] = len(writer.ids)
+        job['rows_failed'] = writer.failed
+        job['errors'] = writer.errors
+        job['progress'] = min(99, round(100 * fraction))
+        if time.monotonic() - last_report >= PROGRESS_INTERVAL_SECONDS:
+            last_report = time.monotonic()
+            _write_job(job)
+
+    writer = BulkWriter(model, 'create', batch_size=IMPORT_BATCH_SIZE, on_flush=report)
+    for number, cells, fraction in rows:
+        # Blank cells are left out so column defaults apply
+        record = {
+            name: value for name, value in zip(columns, cells)
+            if name is not None and value is not None and value != ''
+        }
+        if not record:
+            continue
+        writer.add(number, record)
+    writer.flush()
+    report(writer)
@@ -0,0 +1,418 @@
+"""
+Shared helpers for the collection list endpoints
+Keyset (cursor) pagination over id / updated_at, sparse fieldsets,
+conditional GET via collection version ETags, streamed JSON arrays,
+and the filter[field]= / sort= / q= query language
+"""
+
+import base64
+import hashlib
+import json
+import operator
+import re
+from functools import partial
+from datetime import date, datetime
+
+from flask import request, jsonify, make_response, current_app, Response, stream_with_context
+from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import load_only
+from src.compression import GZIP_ETAG_SUFFIX
+from src.models.database import db
+from src.models.search_index import indexed_columns, matching_ids
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Rows fetched from the cursor (and written to the socket) per batch
+STREAM_BATCH_SIZE = 500
+
+# Columns a client may page over; id is always the tie-breaker
+KEYSET_COLUMNS = ('id', 'updated_at')
+
+# filter[field]=value or filter[field][op]=value
+_FILTER_PARAM = re.compile(r'filter\[(\w+)\](?:\[(\w+)\])?')
+RANGE_OPERATORS = {
+    'lt': operator.lt,
+    'lte': operator.le,
+    'gt': operator.gt,
+    'gte': operator.ge,
+}
+FILTER_OPERATORS = ('eq', 'ne') + tuple(RANGE_OPERATORS)
+NULL_VALUE = 'null'
+_BOOLEAN_VALUES = {'true': True, '1': True, 'false': False, '0': False}
+
+
+class ListQueryError(ValueError):
+    """Raised for malformed list query parameters (reported as 400)"""
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(column, value):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(sort_value, row_id):
+    """Encode the last row's (sort value, id) as an opaque cursor string"""
+    raw = json.dumps([_encode_value(sort_value), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor into [sort_value, id]"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ListQueryError('Invalid cursor')
+    if not isinstance(value, list) or len(value) != 2 or not isinstance(value[1], int):
+        raise ListQueryError('Invalid cursor')
+    return value
+
+
+def _keyset_condition(column, id_column, last_value, last_id, descending):
+    """WHERE clause selecting rows strictly after (last_value, last_id).
+
+    SQLite orders NULLs first ascending and last descending, so a NULL sort
+    value needs its own branch to keep the walk gap-free.
+    """
+    if column is id_column:
+        return id_column < last_id if descending else id_column > last_id
+
+    if descending:
+        if last_value is None:
+            return and_(column.is_(None), id_column < last_id)
+        return or_(
+            column < last_value,
+            and_(column == last_value, id_column < last_id),
+            column.is_(None),
+        )
+
+    if last_value is None:
+        return or_(
+            and_(column.is_(None), id_column > last_id),
+            column.isnot(None),
+        )
+    return or_(column > last_value, and_(column == last_value, id_column > last_id))
+
+
+def parse_limit(args):
+    """Read ?limit=, clamped to 1..MAX_PAGE_SIZE"""
+    raw = args.get('limit')
+    if raw is None or raw == '':
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ListQueryError('limit must be an integer')
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def parse_order(args, allowed=KEYSET_COLUMNS):
+    """Read ?sort= (or the older ?order_by=), prefix '-' for descending.
+
+    Returns (name, descending).
+    """
+    raw = args.get('sort') or args.get('order_by') or 'id'
+    descending = raw.startswith('-')
+    name = raw.lstrip('-')
+    if name not in allowed:
+        raise ListQueryError(f'Cannot order by {name!r}')
+    return name, descending
+
+
+def parse_fields(args, model, allowed=None):
+    """Read ?fields=a,b,c into a list of column names (id always included).
+
+    allowed limits the choice, e.g. to a route's summary columns, so fields=
+    cannot reveal columns the route deliberately leaves out.
+    """
+    raw = args.get('fields')
+    if not raw:
+        return None
+    names = [name.strip() for name in raw.split(',') if name.strip()]
+    columns = allowed or model.__table__.columns.keys()
+    unknown = [name for name in names if name not in columns]
+    if unknown:
+        raise ListQueryError(f"Unknown field(s): {', '.join(unknown)}")
+    if 'id' not in names:
+        names.insert(0, 'id')
+    return list(dict.fromkeys(names))
+
+
+def _coerce_filter_value(column, name, value):
+    try:
+        if column.type.python_type is bool:
+            return _BOOLEAN_VALUES[value.lower()]
+        return _decode_value(column, value)
+    except (KeyError, ValueError):
+        raise ListQueryError(f'Invalid value for {name}: {value!r}')
+
+
+def _filter_condition(attribute, name, op, values):
+    column = attribute.property.columns[0]
+    if op in RANGE_OPERATORS:
+        if NULL_VALUE in values:
+            raise ListQueryError(f'Cannot compare {name} with null')
+        compare = RANGE_OPERATORS[op]
+        return and_(*[compare(attribute, _coerce_filter_value(column, name, value)) for value in values])
+
+    if op == 'ne':
+        # IS NOT keeps rows where the column is NULL, unlike !=
+        return and_(*[
+            attribute.is_not(None if value == NULL_VALUE else _coerce_filter_value(column, name, value))
+            for value in values
+        ])
+
+    matches = [_coerce_filter_value(column, name, value) for value in values if value != NULL_VALUE]
+    conditions = []
+    if len(matches) == 1:
+        conditions.append(attribute == matches[0])
+    elif matches:
+        conditions.append(attribute.in_(matches))
+    if NULL_VALUE in values:
+        conditions.append(attribute.is_(None))
+    return or_(*conditions)
+
+
+def parse_filters(args, model, allowed):
+    """Translate filter[...] parameters into a list of SQL conditions.
+
+    filter[field]=value matches equal rows; repeating the parameter matches
+    any of the values and 'null' matches NULL. filter[field][op]=value
+    compares with ne, lt, lte, gt or gte. Only columns in `allowed` (kept to
+    indexed ones by the routes) can be filtered on.
+    """
+    conditions = []
+    for key in args:
+        if not key.startswith('filter['):
+            continue
+        match = _FILTER_PARAM.fullmatch(key)
+        if match is None:
+            raise ListQueryError(f'Malformed filter parameter {key!r}')
+        name, op = match.group(1), match.group(2) or 'eq'
+        if name not in allowed:
+            raise ListQueryError(f'Cannot filter by {name!r}')
+        if op not in FILTER_OPERATORS:
+            raise ListQueryError(f'Unknown filter operator {op!r}')
+        conditions.append(_filter_condition(getattr(model, name), name, op, args.getlist(key)))
+    return conditions
+
+
+def search_condition(model, args, columns=None):
+    """Restrict to rows matching ?q= in the full-text index, or None.
+
+    With `columns` (a route's public summary), q= is refused if the index
+    holds text from any other column: which rows match would reveal it.
+    """
+    q = args.get('q', '').strip()
+    if not q:
+        return None
+    if columns is not None and not set(indexed_columns(model.__tablename__)) <= set(columns):
+        raise ListQueryError('q is not supported on this collection')
+    try:
+        ids = matching_ids(model.__tablename__, q)
+    except RuntimeError as e:
+        raise ListQueryError(str(e))
+    if ids is None:
+        raise ListQueryError('q must contain at least one word')
+    return model.id.in_(ids)
+
+
+def project(row, fields):
+    """Serialize only the requested columns of a row"""
+    return {name: _encode_value(getattr(row, name)) for name in fields}
+
+
+def is_paginated(args):
+    """Pagination is opt-in so existing clients keep receiving plain arrays"""
+    return 'limit' in args or 'after' in args
+
+
+def _ordering(column, id_column, descending):
+    if column is id_column:
+        return [id_column.desc() if descending else id_column.asc()]
+    return [column.desc(), id_column.desc()] if descending else [column.asc(), id_column.asc()]
+
+
+def paginate(query, model, args, sortable=KEYSET_COLUMNS):
+    """Apply keyset pagination to query.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    limit = parse_limit(args)
+    sort_name, descending = parse_order(args, sortable)
+    column = getattr(model, sort_name)
+    id_column = model.id
+
+    after = args.get('after')
+    if after:
+        last_value, last_id = decode_cursor(after)
+        try:
+            last_value = _decode_value(column.property.columns[0], last_value)
+        except (ValueError, TypeError):
+            # Garbled, or issued for a different sort column
+            raise ListQueryError('Invalid cursor')
+        query = query.filter(_keyset_condition(column, id_column, last_value, last_id, descending))
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.order_by(*_ordering(column, id_column, descending)).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_name), last.id)
+    return rows, next_cursor
+
+
+def stream_json_array(query, serialize):
+    """Stream query results as a JSON array without materializing the list.
+
+    Rows come off the cursor STREAM_BATCH_SIZE at a time via yield_per and
+    are written out per batch, so memory stays bounded by the batch size and
+    the opening bracket goes out before the query runs.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        yield '['
+        separator = ''
+        batch = []
+        for row in query.yield_per(STREAM_BATCH_SIZE):
+            batch.append(dumps(serialize(row)))
+            if len(batch) >= STREAM_BATCH_SIZE:
+                yield separator + ','.join(batch)
+                separator = ','
+                batch = []
+        if batch:
+            yield separator + ','.join(batch)
+        yield ']'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
+def collection_version(model):
+    """Version token for a whole table: one aggregate query, no row hydration.
+
+    max(updated_at) moves on every insert/update, count and max(id) catch
+    deletes and inserts that land within the same timestamp.
+    """
+    latest, count, max_id = db.session.query(
+        func.max(model.updated_at), func.count(model.id), func.max(model.id)
+    ).one()
+    return f'{_encode_value(latest)}|{count}|{max_id}', latest
+
+
+def make_etag(version):
+    """Strong ETag for this URL (path + query string) at the given version"""
+    token = f'{request.full_path}|{version}'
+    return hashlib.sha1(token.encode('utf-8')).hexdigest()
+
+
+def not_modified(etag, last_modified=None):
+    """Return a 304 response if the client already holds etag, else None.
+
+    The gzipped variant's tag (see compress_response) counts as a match too.
+    """
+    for held in (etag, f'{etag}{GZIP_ETAG_SUFFIX}'):
+        if request.if_none_match.contains(held):
+            response = make_response('', 304)
+            return _mark_cacheable(response, held, last_modified)
+    return None
+
+
+def _mark_cacheable(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Stored by the browser but revalidated on every use
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def item_response(model, row_id, serialize, not_found_message):
+    """Serialize a single row with an ETag derived from its updated_at"""
+    updated_at = db.session.query(model.updated_at).filter(model.id == row_id).first()
+    if updated_at is None:
+        return jsonify({'error': not_found_message}), 404
+
+    updated_at = updated_at[0]
+    etag = make_etag(_encode_value(updated_at))
+    cached = not_modified(etag, updated_at)
+    if cached is not None:
+        return cached
+
+    row = db.session.get(model, row_id)
+    if row is None:
+        return jsonify({'error': not_found_message}), 404
+    return _mark_cacheable(jsonify(serialize(row)), etag, updated_at)
+
+
+def list_response(model, serialize, query=None, columns=None, filters=(), sorts=()):
+    """Serialize a collection GET, paginating when ?limit= or ?after= is given.
+
+    Without pagination parameters the response is the legacy JSON array,
+    streamed from the cursor; with them it is {"items": [...], "next_cursor": "..."|null}.
+    ?fields= replaces serialize with a projection of just those columns;
+    `columns` (if given) names the only columns serialize reads, and the
+    only ones ?fields= may pick.
+    filter[...] is allowed on the columns in `filters`, sort= on `sorts`
+    besides id and updated_at, and q= searches the full-text index.
+    If-None-Match matching the collection version short-circuits to 304.
+    """
+    if query is None:
+        query = model.query
+    args = request.args
+
+    version, last_modified = collection_version(model)
+    etag = make_etag(version)
+    cached = not_modified(etag, last_modified)
+    if cached is not None:
+        return cached
+
+    sortable = KEYSET_COLUMNS + tuple(sorts)
+    try:
+        conditions = parse_filters(args, model, filters)
+        matched = search_condition(model, args, columns)
+        if matched is not None:
+            conditions.append(matched)
+        if conditions:
+            query = query.filter(*conditions)
+
+        fields = parse_fields(args, model, columns)
+        if fields:
+            serialize = partial(project, fields=fields)
+            columns = fields
+
+        if columns:
+            # Push the projection into SQL; anything else stays unloaded
+            sort_name, _ = parse_order(args, sortable)
+            names = dict.fromkeys(list(columns) + [sort_name])
+            query = query.options(load_only(*[getattr(model, name) for name in names], raiseload=True))
+
+        if not is_paginated(args):
+            sort_name, descending = parse_order(args, sortable)
+            ordering = _ordering(getattr(model, sort_name), model.id, descending)
+            response = stream_json_array(query.order_by(*ordering), serialize)
+            return _mark_cacheable(response, etag, last_modified)
+        rows, next_cursor = paginate(query, model, args, sortable)
+    except ListQueryError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = jsonify({
+        'items': [serialize(row) for row in rows],
+        'next_cursor': next_cursor
+    })
+    return _mark_cacheable(response, etag, last_modified)
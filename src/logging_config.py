@@ -1,46 +1,282 @@
 """
 Logging configuration with sensitive field redaction
+
+Request threads only put records on a bounded queue; a QueueListener thread
+does the redaction, formatting, file I/O and rotation, flushing once per
+batch instead of once per record.
+
+LOG_FORMAT=json writes one JSON object per line carrying request id, route,
+status, duration and error class. Rotated segments are also compacted into
+column-oriented gzip files under logs/archive.
 """
 
+import atexit
+import gzip
+import json
 import logging
 import logging.handlers
 import os
+import queue
 import re
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
 from pathlib import Path
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+
+LOG_ARCHIVE_KEEP = int(os.environ.get('LOG_ARCHIVE_KEEP', '50'))
+
+# Request-scoped attributes copied onto records and into JSON output
+CONTEXT_FIELDS = ('request_id', 'method', 'route', 'path', 'status', 'duration_ms', 'error_class')
+
+_REQUEST_ID = re.compile(r'[\w.-]{1,64}')
+_TEXT_LINE = re.compile(
+    r'(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) \[(?P<level>[A-Z]+)\] (?P<logger>[^\s:]+)[^:]*: (?P<msg>.*)'
+)
 
 
 class SensitiveDataFilter(logging.Filter):
-    """Filter to redact sensitive information from logs"""
-
-    SENSITIVE_PATTERNS = [
-        (re.compile(r'("password"\s*:\s*)"[^"]*"', re.IGNORECASE), r'\1"[REDACTED]"'),
-        (re.compile(r'("token"\s*:\s*)"[^"]*"', re.IGNORECASE), r'\1"[REDACTED]"'),
-        (re.compile(r'("key"\s*:\s*)"[^"]*"', re.IGNORECASE), r'\1"[REDACTED]"'),
-        (re.compile(r'("secret"\s*:\s*)"[^"]*"', re.IGNORECASE), r'\1"[REDACTED]"'),
-        (re.compile(r'(password=)[^\s&]+', re.IGNORECASE), r'\1[REDACTED]'),
-        (re.compile(r'(api[_-]?key=)[^\s&]+', re.IGNORECASE), r'\1[REDACTED]'),
-        (re.compile(r'(Bearer\s+)[^\s]+', re.IGNORECASE), r'\1[REDACTED]'),
-    ]
+    """Filter to redact sensitive information from logs.
+
+    All patterns are one compiled alternation applied in a single pass, and
+    only to strings containing one of SENSITIVE_MARKERS. Redacted records are
+    flagged so the other handlers the record reaches skip the work.
+    """
+
+    SENSITIVE_PATTERN = re.compile(
+        r'(?P<json>"(?:password|token|key|secret)"\s*:\s*)"[^"]*"'
+        r'|(?P<param>(?:password|api[_-]?key)=)[^\s&]+'
+        r'|(?P<bearer>Bearer\s+)[^\s]+',
+        re.IGNORECASE
+    )
+    # Every pattern above contains one of these (case-insensitively)
+    SENSITIVE_MARKERS = ('password', 'token', 'key', 'secret', 'bearer')
+
+    @staticmethod
+    def _replace(match):
+        if match.group('json'):
+            return match.group('json') + '"[REDACTED]"'
+        return (match.group('param') or match.group('bearer')) + '[REDACTED]'
+
+    @classmethod
+    def redact(cls, text):
+        lowered = text.lower()
+        if not any(marker in lowered for marker in cls.SENSITIVE_MARKERS):
+            return text
+        return cls.SENSITIVE_PATTERN.sub(cls._replace, text)
 
     def filter(self, record):
         """Redact sensitive information from log message"""
+        if getattr(record, 'redacted', False):
+            return True
+
         if isinstance(record.msg, str):
-            for pattern, replacement in self.SENSITIVE_PATTERNS:
-                record.msg = pattern.sub(replacement, record.msg)
+            record.msg = self.redact(record.msg)
 
         # Also redact from args if present
-        if record.args:
-            redacted_args = []
-            for arg in record.args:
-                if isinstance(arg, str):
-                    for pattern, replacement in self.SENSITIVE_PATTERNS:
-                        arg = pattern.sub(replacement, arg)
-                redacted_args.append(arg)
-            record.args = tuple(redacted_args)
+        if isinstance(record.args, tuple):
+            record.args = tuple(self.redact(arg) if isinstance(arg, str) else arg for arg in record.args)
+
+        record.redacted = True
+        return True
+
 
+class RequestContextFilter(logging.Filter):
+    """Stamp records logged inside a request with its id, method and route"""
+
+    def filter(self, record):
+        if has_request_context():
+            if not hasattr(record, 'request_id'):
+                record.request_id = g.get('request_id')
+            if not hasattr(record, 'method'):
+                record.method = request.method
+            if not hasattr(record, 'route'):
+                record.route = request.url_rule.rule if request.url_rule else None
+            if not hasattr(record, 'path'):
+                record.path = request.path
         return True
 
 
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; context fields are included when set"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry['error_class'] = record.exc_info[0].__name__
+            entry['msg'] += '\n' + self.formatException(record.exc_info)
+        if record.levelno >= logging.ERROR:
+            entry['source'] = f'{record.filename}:{record.lineno}'
+        return json.dumps(entry, default=str)
+
+
+def _parse_line(line):
+    """Parse one JSON or text log line into a dict (None if unrecognised)"""
+    if line.startswith('{'):
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+    match = _TEXT_LINE.match(line)
+    return match.groupdict() if match else None
+
+
+def compact_log(path, archive_dir, keep=LOG_ARCHIVE_KEEP):
+    """Write a rotated log segment to archive_dir as gzip'd column arrays.
+
+    The archive is {"source", "rows", "columns": {field: [values...]}}, so a
+    query reads only the columns it needs and repeated values compress well.
+    Continuation lines (tracebacks) are folded into the previous row's msg.
+    """
+    path = Path(path)
+    archive_dir = Path(archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+
+    rows = []
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            entry = _parse_line(line)
+            if entry is not None:
+                rows.append(entry)
+            elif rows:
+                rows[-1]['msg'] = f"{rows[-1].get('msg', '')}\n{line}"
+
+    names = []
+    for entry in rows:
+        for name in entry:
+            if name not in names:
+                names.append(name)
+    columns = {name: [entry.get(name) for entry in rows] for name in names}
+
+    stem = path.name.split('.')[0]
+    target = archive_dir / f"{stem}-{datetime.now().strftime('%Y%m%dT%H%M%S%f')}.columns.json.gz"
+    tmp = target.with_name(target.name + '.tmp')
+    with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+        json.dump({'source': path.name, 'rows': len(rows), 'columns': columns}, f)
+    os.replace(tmp, target)
+
+    archives = sorted(archive_dir.glob(f'{stem}-*.columns.json.gz'))
+    for old_archive in archives[:-keep] if len(archives) > keep else []:
+        old_archive.unlink()
+    return target
+
+
+def read_archive(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _archiving_rotator(archive_dir):
+    """RotatingFileHandler.rotator that keeps the plain .1 file and archives it"""
+
+    def rotate(source, dest):
+        os.rename(source, dest)
+        try:
+            compact_log(dest, archive_dir)
+        except Exception as e:
+            # Logging from inside the writer thread could deadlock on a full queue
+            print(f'Log archive failed for {dest}: {e}', file=sys.stderr)
+
+    return rotate
+
+
+class _DeferredFlushMixin:
+    """Skip the per-record flush; the queue listener calls flush_batch()"""
+
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        super().flush()
+
+
+class BatchRotatingFileHandler(_DeferredFlushMixin, logging.handlers.RotatingFileHandler):
+    pass
+
+
+class BatchStreamHandler(_DeferredFlushMixin, logging.StreamHandler):
+    pass
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler for a bounded queue with a drop or block policy when full.
+
+    ERROR and above always wait up to block_timeout rather than being dropped.
+    """
+
+    def __init__(self, log_queue, policy='drop', block_timeout=1.0):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    def prepare(self, record):
+        # prepare() drops exc_info; keep the exception class for JSON output
+        if record.exc_info and not getattr(record, 'error_class', None):
+            record.error_class = record.exc_info[0].__name__
+        return super().prepare(record)
+
+    def enqueue(self, record):
+        try:
+            if self.policy == 'block' or record.levelno >= logging.ERROR:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """Flushes handlers when the queue drains or every batch_size records"""
+
+    def __init__(self, log_queue, *handlers, batch_size=100, queue_handler=None):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        self.queue_handler = queue_handler
+        self._pending = 0
+        self._reported_drops = 0
+
+    def handle(self, record):
+        super().handle(record)
+        self._pending += 1
+        if self._pending >= self.batch_size or self.queue.empty():
+            self.flush()
+
+    def flush(self):
+        self._report_drops()
+        for handler in self.handlers:
+            getattr(handler, 'flush_batch', handler.flush)()
+        self._pending = 0
+
+    def _report_drops(self):
+        dropped = self.queue_handler.dropped if self.queue_handler else 0
+        if dropped > self._reported_drops:
+            record = logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                'Log queue full: dropped %d record(s)', (dropped - self._reported_drops,), None
+            )
+            self._reported_drops = dropped
+            super().handle(record)
+
+    def stop(self):
+        if self._thread is None:  # already stopped (explicitly, then atexit)
+            return
+        super().stop()
+        self.flush()
+
+
 def setup_logging(app):
     """Configure rotating file logs with INFO level for production"""
 
@@ -51,48 +287,78 @@ def setup_logging(app):
     # Create logs directory
     log_dir = Path(__file__).parent.parent / 'logs'
     log_dir.mkdir(exist_ok=True)
+    archive_dir = log_dir / 'archive'
+
+    # 'text' (default) or 'json' (one object per line)
+    log_format = os.environ.get('LOG_FORMAT', 'text')
+    json_formatter = JsonFormatter() if log_format == 'json' else None
+    # Per-request access records (status, duration); default on in json mode
+    access_log = os.environ.get('LOG_ACCESS', '1' if json_formatter else '0') == '1'
 
     # Application log (general info)
     app_log_file = log_dir / 'app.log'
-    app_handler = logging.handlers.RotatingFileHandler(
+    app_handler = BatchRotatingFileHandler(
         app_log_file,
         maxBytes=10 * 1024 * 1024,  # 10 MB
         backupCount=5
     )
     app_handler.setLevel(log_level)
-    app_handler.setFormatter(logging.Formatter(
+    app_handler.setFormatter(json_formatter or logging.Formatter(
         '%(asctime)s [%(levelname)s] %(name)s: %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     ))
+    app_handler.rotator = _archiving_rotator(archive_dir)
     app_handler.addFilter(SensitiveDataFilter())
 
     # Error log (errors and above)
     error_log_file = log_dir / 'error.log'
-    error_handler = logging.handlers.RotatingFileHandler(
+    error_handler = BatchRotatingFileHandler(
         error_log_file,
         maxBytes=10 * 1024 * 1024,  # 10 MB
         backupCount=5
     )
     error_handler.setLevel(logging.ERROR)
-    error_handler.setFormatter(logging.Formatter(
+    error_handler.setFormatter(json_formatter or logging.Formatter(
         '%(asctime)s [%(levelname)s] %(name)s [%(filename)s:%(lineno)d]: %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     ))
+    error_handler.rotator = _archiving_rotator(archive_dir)
     error_handler.addFilter(SensitiveDataFilter())
 
     # Console handler (for Railway logs)
-    console_handler = logging.StreamHandler()
+    console_handler = BatchStreamHandler()
     console_handler.setLevel(log_level)
-    console_handler.setFormatter(logging.Formatter(
+    console_handler.setFormatter(json_formatter or logging.Formatter(
         '[%(levelname)s] %(name)s: %(message)s'
     ))
     console_handler.addFilter(SensitiveDataFilter())
 
-    # Configure Flask app logger
+    # Bounded queue between request threads and the writer thread
+    queue_size = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+    queue_policy = os.environ.get('LOG_QUEUE_POLICY', 'drop')  # 'drop' or 'block'
+    block_timeout = float(os.environ.get('LOG_QUEUE_BLOCK_TIMEOUT', '1.0'))
+    batch_size = int(os.environ.get('LOG_FLUSH_BATCH', '100'))
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = BoundedQueueHandler(log_queue, policy=queue_policy, block_timeout=block_timeout)
+    queue_handler.addFilter(RequestContextFilter())
+
+    previous_listener = app.extensions.get('log_listener')
+    if previous_listener:
+        previous_listener.stop()
+    else:
+        _register_request_logging(app, access_log)
+    listener = BatchingQueueListener(
+        log_queue, app_handler, error_handler, console_handler,
+        batch_size=batch_size, queue_handler=queue_handler
+    )
+    listener.start()
+    app.extensions['log_listener'] = listener
+    atexit.register(listener.stop)
+
+    # Flask app logger propagates to root; drop Flask's own stderr handler
     app.logger.setLevel(log_level)
-    app.logger.addHandler(app_handler)
-    app.logger.addHandler(error_handler)
-    app.logger.addHandler(console_handler)
+    app.logger.removeHandler(default_handler)
 
     # Configure root logger
     root_logger = logging.getLogger()
@@ -102,12 +368,36 @@ def setup_logging(app):
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
 
-    root_logger.addHandler(app_handler)
-    root_logger.addHandler(error_handler)
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(queue_handler)
 
     # Log startup message
-    app.logger.info(f"Logging configured: level={log_level_name}, handlers={len(app.logger.handlers)}")
+    app.logger.info(f"Logging configured: level={log_level_name}, format={log_format}, "
+                    f"queue={queue_size} ({queue_policy}), handlers={len(listener.handlers)}")
     app.logger.info(f"Log files: {app_log_file}, {error_log_file}")
 
     return app.logger
+
+
+def _register_request_logging(app, access_log):
+    """Assign each request an id (X-Request-ID) and optionally log its outcome"""
+    access_logger = logging.getLogger('access')
+
+    @app.before_request
+    def start_request_log():
+        incoming = request.headers.get('X-Request-ID', '')
+        g.request_id = incoming if _REQUEST_ID.fullmatch(incoming) else uuid.uuid4().hex
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def log_request(response):
+        request_id = g.get('request_id')
+        if request_id:
+            response.headers.setdefault('X-Request-ID', request_id)
+        started = g.get('request_started')
+        if access_log and started is not None:
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            access_logger.info(
+                '%s %s %s %.1fms', request.method, request.path, response.status_code, duration_ms,
+                extra={'status': response.status_code, 'duration_ms': duration_ms}
+            )
+        return response
@@ -5,10 +5,10 @@ import logging
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory, jsonify, request, session
+from flask import Flask, jsonify, request, session
 from datetime import timedelta, datetime
 from flask_wtf.csrf import generate_csrf
-from src.models.database import db
+from src.models.database import db, ensure_indexes
 from src.models.user import User
 from src.models.deliverable import Deliverable
 from src.models.business_process import BusinessProcess
@@ -16,6 +16,8 @@ from src.models.ai_technology import AITechnology
 from src.models.software_tool import SoftwareTool
 from src.models.research_item import ResearchItem
 from src.models.integration import Integration
+from src.models.dashboard_aggregate import ensure_aggregates
+from src.models.search_index import ensure_search_index
 from src.routes.user import user_bp
 from src.routes.deliverables import deliverables_bp
 from src.routes.business_processes import business_processes_bp
@@ -27,9 +29,16 @@ from src.routes.integrations import integrations_bp
 from src.routes.auth import auth_bp
 from src.routes.admin import admin_bp
 from src.routes.debug import debug_bp
+from src.routes.public_status import public_status_bp
 from flask_cors import CORS
 from src.extensions import csrf, limiter
 from src.logging_config import setup_logging
+from src.metrics import init_metrics
+from src.security_headers import header_policies, csp_nonce
+from src.static_assets import StaticAssets
+from src.compression import init_compression
+from src.backup_engine import backup_manager
+from src.imports import init_imports
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'HL_Stearns_Capstone_2025_Secure_Key_#$%')
@@ -50,6 +59,18 @@ CORS(app)
 # Initialize logging with redaction
 logger = setup_logging(app)
 
+# Live request metrics (served at /api/public/metrics)
+init_metrics(app)
+
+# gzip large JSON API responses for clients that accept it
+init_compression(app)
+
+# Templates mark inline scripts with nonce="{{ csp_nonce() }}"
+app.jinja_env.globals['csp_nonce'] = csp_nonce
+
+# Upload size limits must be registered before CSRFProtect parses the form
+init_imports(app)
+
 # Initialize extensions
 csrf.init_app(app)
 limiter.init_app(app)
@@ -64,17 +85,26 @@ app.register_blueprint(integrations_bp)
 app.register_blueprint(advanced_features_bp)
 app.register_blueprint(auth_bp)
 app.register_blueprint(admin_bp)
+app.register_blueprint(public_status_bp)
 
 # Register debug routes only when enabled (staging only)
 if os.environ.get("ENABLE_DEBUG_ROUTES") == "1":
     app.register_blueprint(debug_bp)
 
 # uncomment if you need to use database
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+# SQLite pragmas (WAL, busy_timeout, ...) are applied per connection; see src/models/database.py
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+    'SQLALCHEMY_DATABASE_URI',
+    f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 with app.app_context():
     db.create_all()
+    ensure_indexes()
+    ensure_aggregates()
+    ensure_search_index()
+backup_manager.init_app(app)
 
 # CSRF token endpoint
 @app.route('/api/csrf-token', methods=['GET'])
@@ -109,32 +139,22 @@ def enforce_idle_timeout():
 
         session['_last_seen'] = now
 
-# Security headers middleware
+# Security headers middleware (policies are precomputed per route class)
 @app.after_request
 def set_security_headers(response):
-    response.headers['X-Robots-Tag'] = 'noindex, nofollow'
-    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, private'
-    response.headers['X-Content-Type-Options'] = 'nosniff'
-    response.headers['X-Frame-Options'] = 'DENY'
-    response.headers['X-XSS-Protection'] = '1; mode=block'
-    # CSP: Allow unsafe-inline for styles (Bootstrap), strict script-src
-    response.headers['Content-Security-Policy'] = (
-        "default-src 'self'; "
-        "img-src 'self' data: https:; "
-        "style-src 'self' 'unsafe-inline' https://cdnjs.cloudflare.com; "
-        "script-src 'self' https://cdnjs.cloudflare.com; "
-        "font-src 'self' data: https://cdnjs.cloudflare.com; "
-        "connect-src 'self'; "
-        "object-src 'none'; "
-        "frame-ancestors 'none'; "
-        "report-uri /csp-report"
-    )
-    return response
+    return header_policies.apply(response)
 
 @app.route('/__version__')
 def version():
     return jsonify({"tag": "v0.36.4-ui-modern", "phase": "1d-modernization"})
 
+# In-memory manifest of the static folder: fingerprinted aliases, rewritten
+# HTML pages and resident small files. Rebuilt on change in debug/STATIC_RELOAD.
+static_assets = StaticAssets(
+    app.static_folder,
+    watch=app.debug or os.environ.get('STATIC_RELOAD') == '1'
+)
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
@@ -142,12 +162,20 @@ def serve(path):
     if static_folder_path is None:
             return "Static folder not configured", 404
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
+    static_assets.refresh_if_changed()
+
+    hashed = static_assets.hashed_response(path)
+    if hashed is not None:
+        return hashed
+
+    if path in static_assets.pages:
+        return static_assets.page_response(path)
+
+    if path in static_assets.files:
+        return static_assets.file_response(path)
     else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
+        if 'index.html' in static_assets.pages:
+            return static_assets.page_response('index.html')
         else:
             return "index.html not found", 404
 
@@ -0,0 +1,226 @@
+"""
+In-process request metrics
+
+before_request/after_request hooks record per-route request counts, server
+error counts and latency histograms into fixed-size bucket arrays. Nothing
+is read from logs; snapshots are served as JSON or Prometheus text, and the
+health score is computed from the last HEALTH_WINDOW_MINUTES of traffic.
+"""
+
+import bisect
+import os
+import threading
+import time
+from flask import g, request
+
+# Histogram upper bounds in milliseconds; one extra slot counts +Inf
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+HEALTH_WINDOW_MINUTES = int(os.environ.get('HEALTH_WINDOW_MINUTES', '15'))
+
+# p95 latency (ms) thresholds -> health score penalty
+LATENCY_PENALTIES = ((250, 0), (500, 5), (1000, 15), (2500, 30))
+MAX_LATENCY_PENALTY = 40
+# Penalty points per percent of requests answered with a 5xx
+ERROR_PENALTY_PER_PERCENT = 5
+MAX_ERROR_PENALTY = 60
+
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+class _Series:
+    """Count, error count, latency sum and histogram for one route or window"""
+
+    __slots__ = ('count', 'errors', 'sum_ms', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.sum_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def observe(self, duration_ms, is_error):
+        self.count += 1
+        self.errors += is_error
+        self.sum_ms += duration_ms
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.errors += other.errors
+        self.sum_ms += other.sum_ms
+        for index, value in enumerate(other.buckets):
+            self.buckets[index] += value
+
+
+def percentile(buckets, fraction):
+    """Upper bound (ms) of the bucket holding the given fraction of requests"""
+    total = sum(buckets)
+    if not total:
+        return None
+    threshold = fraction * total
+    seen = 0
+    for index, value in enumerate(buckets):
+        seen += value
+        if seen >= threshold:
+            return LATENCY_BUCKETS_MS[min(index, len(LATENCY_BUCKETS_MS) - 1)]
+    return LATENCY_BUCKETS_MS[-1]
+
+
+class MetricsRegistry:
+    """Per-route series plus a ring of per-minute totals for the health score"""
+
+    def __init__(self, window_minutes=HEALTH_WINDOW_MINUTES):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._window = [(None, _Series()) for _ in range(window_minutes)]
+        self.started_at = time.time()
+
+    def observe(self, method, route, status, duration_ms, now=None):
+        is_error = status >= 500
+        minute = int((now or time.time()) // 60)
+        slot = minute % len(self._window)
+        with self._lock:
+            series = self._routes.get((method, route))
+            if series is None:
+                series = self._routes[(method, route)] = _Series()
+            series.observe(duration_ms, is_error)
+
+            slot_minute, window_series = self._window[slot]
+            if slot_minute != minute:
+                window_series = _Series()
+                self._window[slot] = (minute, window_series)
+            window_series.observe(duration_ms, is_error)
+
+    def recent(self, now=None):
+        """Totals over the last window_minutes"""
+        oldest = int((now or time.time()) // 60) - len(self._window) + 1
+        totals = _Series()
+        with self._lock:
+            for minute, series in self._window:
+                if minute is not None and minute >= oldest:
+                    totals.merge(series)
+        return totals
+
+    def snapshot(self):
+        """[(method, route, count, errors, sum_ms, buckets)] sorted by route"""
+        with self._lock:
+            return sorted(
+                (method, route, s.count, s.errors, s.sum_ms, list(s.buckets))
+                for (method, route), s in self._routes.items()
+            )
+
+    def health(self, now=None):
+        """Health score (0-100) from recent p95 latency and 5xx rate"""
+        recent = self.recent(now)
+        p95 = percentile(recent.buckets, 0.95)
+        error_rate = recent.errors / recent.count if recent.count else 0.0
+
+        latency_penalty = MAX_LATENCY_PENALTY
+        if p95 is None:
+            latency_penalty = 0
+        else:
+            for limit, penalty in LATENCY_PENALTIES:
+                if p95 <= limit:
+                    latency_penalty = penalty
+                    break
+        error_penalty = min(MAX_ERROR_PENALTY, error_rate * 100 * ERROR_PENALTY_PER_PERCENT)
+
+        return {
+            'score': max(0, round(100 - latency_penalty - error_penalty)),
+            'window_minutes': len(self._window),
+            'requests': recent.count,
+            'errors': recent.errors,
+            'error_rate': round(error_rate, 4),
+            'p95_ms': p95,
+        }
+
+    def to_dict(self):
+        routes = []
+        for method, route, count, errors, sum_ms, buckets in self.snapshot():
+            routes.append({
+                'method': method,
+                'route': route,
+                'requests': count,
+                'errors': errors,
+                'avg_ms': round(sum_ms / count, 2) if count else None,
+                'p50_ms': percentile(buckets, 0.5),
+                'p95_ms': percentile(buckets, 0.95),
+                'p99_ms': percentile(buckets, 0.99),
+                # Counts per buckets_ms bound, then one for slower requests
+                'histogram': buckets,
+            })
+        return {
+            'uptime_seconds': round(time.time() - self.started_at),
+            'buckets_ms': list(LATENCY_BUCKETS_MS),
+            'health': self.health(),
+            'routes': routes,
+        }
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = [
+            '# HELP http_requests_total Requests handled, by route.',
+            '# TYPE http_requests_total counter',
+        ]
+        snapshot = self.snapshot()
+        for method, route, count, _, _, _ in snapshot:
+            lines.append(f'http_requests_total{{{_labels(method, route)}}} {count}')
+
+        lines += [
+            '# HELP http_request_errors_total Requests answered with a 5xx status, by route.',
+            '# TYPE http_request_errors_total counter',
+        ]
+        for method, route, _, errors, _, _ in snapshot:
+            lines.append(f'http_request_errors_total{{{_labels(method, route)}}} {errors}')
+
+        lines += [
+            '# HELP http_request_duration_seconds Request latency, by route.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for method, route, count, _, sum_ms, buckets in snapshot:
+            labels = _labels(method, route)
+            cumulative = 0
+            for bound, value in zip(LATENCY_BUCKETS_MS, buckets):
+                cumulative += value
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound / 1000:g}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {sum_ms / 1000:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {count}')
+
+        lines += [
+            '# HELP app_health_score Health score from recent p95 latency and error rate.',
+            '# TYPE app_health_score gauge',
+            f"app_health_score {self.health()['score']}",
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(method, route):
+    return f'method="{_escape(method)}",route="{_escape(route)}"'
+
+
+registry = MetricsRegistry()
+
+
+def init_metrics(app, metrics=registry):
+    """Register the hooks that feed the registry"""
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            # Label by URL rule, not path, so label cardinality stays bounded
+            route = request.url_rule.rule if request.url_rule else UNMATCHED_ROUTE
+            metrics.observe(request.method, route, response.status_code,
+                            (time.perf_counter() - started) * 1000)
+        return response
+
+    return metrics
@@ -4,6 +4,11 @@ from datetime import datetime
 
 class AITechnology(db.Model):
     __tablename__ = 'ai_technologies'
+    __table_args__ = (
+        db.Index('ix_ai_technologies_category_evaluation_status', 'category', 'evaluation_status'),
+        db.Index('ix_ai_technologies_evaluation_status', 'evaluation_status'),
+        db.Index('ix_ai_technologies_updated_at', 'updated_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
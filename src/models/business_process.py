@@ -3,6 +3,12 @@ from src.models.database import db
 
 class BusinessProcess(db.Model):
     __tablename__ = 'business_processes'
+    __table_args__ = (
+        db.Index('ix_business_processes_department_evaluation_status', 'department', 'evaluation_status'),
+        db.Index('ix_business_processes_evaluation_status', 'evaluation_status'),
+        db.Index('ix_business_processes_automation_potential', 'automation_potential'),
+        db.Index('ix_business_processes_updated_at', 'updated_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
@@ -0,0 +1,192 @@
+"""
+Incrementally maintained counters behind /api/analytics/dashboard
+
+Each (metric, bucket) row holds the number of entity rows that currently fall
+in that bucket, e.g. ('deliverables_by_status', 'Completed') -> 12. Mapper
+events adjust the counters inside the same flush that writes the entity, so
+the dashboard reads a handful of rows instead of scanning six tables.
+"""
+
+from sqlalchemy import event, inspect, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from src.models.database import db
+from src.models.deliverable import Deliverable
+from src.models.business_process import BusinessProcess
+from src.models.ai_technology import AITechnology
+from src.models.software_tool import SoftwareTool
+from src.models.research_item import ResearchItem
+from src.models.integration import Integration
+
+
+class DashboardAggregate(db.Model):
+    __tablename__ = 'dashboard_aggregates'
+
+    metric = db.Column(db.String(64), primary_key=True)
+    bucket = db.Column(db.String(200), primary_key=True, default='')
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Marker row written once the counters have been backfilled from the tables
+BUILT_METRIC = '_built'
+
+
+def _column_bucket(column):
+    def bucket(values):
+        value = values[column]
+        return '' if value is None else str(value)
+    return bucket
+
+
+def _open_due_bucket(values):
+    """Bucket open deliverables by due date so overdue = sum(buckets < today)"""
+    if values['status'] == 'Completed':
+        return None
+    due_date = values['due_date']
+    return due_date.isoformat() if due_date else ''
+
+
+# model -> [(metric, columns the bucket depends on, bucket function)]
+# A bucket function returning None means the row is not counted.
+METRICS = {
+    Deliverable: [
+        ('deliverables_by_status', ('status',), _column_bucket('status')),
+        ('deliverables_by_phase', ('phase',), _column_bucket('phase')),
+        ('open_deliverables_by_due_date', ('status', 'due_date'), _open_due_bucket),
+    ],
+    BusinessProcess: [
+        ('processes_by_department', ('department',), _column_bucket('department')),
+        ('processes_by_status', ('evaluation_status',), _column_bucket('evaluation_status')),
+    ],
+    AITechnology: [
+        ('technologies_by_category', ('category',), _column_bucket('category')),
+        ('technologies_by_status', ('evaluation_status',), _column_bucket('evaluation_status')),
+    ],
+    SoftwareTool: [
+        ('tools_by_status', ('evaluation_status',), _column_bucket('evaluation_status')),
+    ],
+    ResearchItem: [
+        ('research_by_type', ('research_type',), _column_bucket('research_type')),
+        ('research_by_status', ('completion_status',), _column_bucket('completion_status')),
+    ],
+    Integration: [
+        ('integrations_by_setup_status', ('setup_status',), _column_bucket('setup_status')),
+    ],
+}
+
+
+def _apply(connection, deltas):
+    """Add {(metric, bucket): delta} to the counters with one upsert each"""
+    table = DashboardAggregate.__table__
+    for (metric, bucket), delta in deltas.items():
+        if not delta:
+            continue
+        stmt = sqlite_insert(table).values(metric=metric, bucket=bucket, count=delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.metric, table.c.bucket],
+            set_={'count': table.c.count + stmt.excluded.count},
+        )
+        connection.execute(stmt)
+
+
+def _row_deltas(model, values, sign, deltas):
+    for metric, _, bucket_fn in METRICS[model]:
+        bucket = bucket_fn(values)
+        if bucket is not None:
+            deltas[(metric, bucket)] = deltas.get((metric, bucket), 0) + sign
+
+
+def _current_values(model, target):
+    names = {name for _, columns, _ in METRICS[model] for name in columns}
+    return {name: getattr(target, name) for name in names}
+
+
+def _previous_values(model, target):
+    state = inspect(target)
+    values = {}
+    for _, columns, _ in METRICS[model]:
+        for name in columns:
+            history = state.attrs[name].history
+            values[name] = history.deleted[0] if history.deleted else getattr(target, name)
+    return values
+
+
+def record_rows(connection, model, rows, sign=1):
+    """Count (sign=1) or uncount (sign=-1) plain row mappings.
+
+    For writes that bypass the ORM unit of work (bulk inserts, Core
+    statements), which do not fire the mapper events below.
+    """
+    deltas = {}
+    for row in rows:
+        _row_deltas(model, row, sign, deltas)
+    _apply(connection, deltas)
+
+
+def _after_insert(mapper, connection, target):
+    model = mapper.class_
+    deltas = {}
+    _row_deltas(model, _current_values(model, target), 1, deltas)
+    _apply(connection, deltas)
+
+
+def _after_update(mapper, connection, target):
+    model = mapper.class_
+    deltas = {}
+    _row_deltas(model, _previous_values(model, target), -1, deltas)
+    _row_deltas(model, _current_values(model, target), 1, deltas)
+    _apply(connection, deltas)
+
+
+def _before_delete(mapper, connection, target):
+    # before_delete rather than after_delete: expired attributes can still be
+    # refreshed here, whereas after the DELETE the row is gone
+    model = mapper.class_
+    deltas = {}
+    _row_deltas(model, _current_values(model, target), -1, deltas)
+    _apply(connection, deltas)
+
+
+def _track_previous_value(target, value, oldvalue, initiator):
+    pass
+
+
+for _model, _metrics in METRICS.items():
+    event.listen(_model, 'after_insert', _after_insert)
+    event.listen(_model, 'after_update', _after_update)
+    event.listen(_model, 'before_delete', _before_delete)
+    # active_history loads the old value on assignment even when the instance
+    # was expired, so _after_update can always uncount the previous bucket
+    for _name in {name for _, columns, _ in _metrics for name in columns}:
+        event.listen(getattr(_model, _name), 'set', _track_previous_value, active_history=True)
+
+
+def rebuild_aggregates():
+    """Recompute every counter from the entity tables (one GROUP BY per metric)"""
+    connection = db.session.connection()
+    connection.execute(DashboardAggregate.__table__.delete())
+    deltas = {}
+    for model, metrics in METRICS.items():
+        for metric, columns, bucket_fn in metrics:
+            cols = [getattr(model, name) for name in columns]
+            for row in connection.execute(select(*cols, func.count()).group_by(*cols)):
+                bucket = bucket_fn(dict(zip(columns, row[:-1])))
+                if bucket is not None:
+                    deltas[(metric, bucket)] = deltas.get((metric, bucket), 0) + row[-1]
+    deltas[(BUILT_METRIC, '')] = 1
+    _apply(connection, deltas)
+    db.session.commit()
+
+
+def ensure_aggregates():
+    """Backfill the counters once for databases created before they existed"""
+    if db.session.get(DashboardAggregate, (BUILT_METRIC, '')) is None:
+        rebuild_aggregates()
+
+
+def load_aggregates():
+    """Return {metric: {bucket: count}} for all non-empty buckets"""
+    result = {}
+    rows = db.session.query(DashboardAggregate).filter(DashboardAggregate.count != 0)
+    for row in rows:
+        result.setdefault(row.metric, {})[row.bucket] = row.count
+    return result
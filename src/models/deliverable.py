@@ -3,6 +3,13 @@ from src.models.database import db
 
 class Deliverable(db.Model):
     __tablename__ = 'deliverables'
+    # Equality filters lead; (updated_at, id) serves order_by=updated_at paging
+    __table_args__ = (
+        db.Index('ix_deliverables_status_due_date', 'status', 'due_date'),
+        db.Index('ix_deliverables_phase_status', 'phase', 'status'),
+        db.Index('ix_deliverables_due_date', 'due_date'),
+        db.Index('ix_deliverables_updated_at', 'updated_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
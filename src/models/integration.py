@@ -4,6 +4,11 @@ from datetime import datetime
 
 class Integration(db.Model):
     __tablename__ = 'integrations'
+    __table_args__ = (
+        db.Index('ix_integrations_platform_setup_status', 'platform', 'setup_status'),
+        db.Index('ix_integrations_setup_status', 'setup_status'),
+        db.Index('ix_integrations_updated_at', 'updated_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
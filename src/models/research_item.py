@@ -3,6 +3,11 @@ from src.models.database import db
 
 class ResearchItem(db.Model):
     __tablename__ = 'research_items'
+    __table_args__ = (
+        db.Index('ix_research_items_research_type_completion_status', 'research_type', 'completion_status'),
+        db.Index('ix_research_items_completion_status', 'completion_status'),
+        db.Index('ix_research_items_updated_at', 'updated_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
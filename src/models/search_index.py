@@ -0,0 +1,186 @@
+"""
+Cross-entity full-text search backed by an SQLite FTS5 table
+
+Every searchable row is mirrored into `search_index` by AFTER INSERT/UPDATE/
+DELETE triggers, so ORM writes, bulk inserts and raw SQL all stay in sync.
+The FTS rowid is id * 8 + type code, which keeps updates and deletes to a
+single rowid lookup instead of a scan of the index. Without FTS5 the index
+is never built: search() finds nothing and matching_ids() refuses.
+"""
+
+import logging
+import re
+from sqlalchemy import Integer, text
+from src.models.database import db
+
+logger = logging.getLogger(__name__)
+
+# search type -> (table, type code, title column, body columns). /api/search
+# and ?q= are public, so only columns the public list views already show
+# belong here (see TOOL_SUMMARY_COLUMNS / INTEGRATION_SUMMARY_COLUMNS).
+SEARCHABLE = {
+    'deliverables': ('deliverables', 1, 'title',
+                     ('description', 'phase', 'category', 'status', 'notes')),
+    'processes': ('business_processes', 2, 'name',
+                  ('description', 'department', 'process_type', 'current_system', 'pain_points', 'notes')),
+    'technologies': ('ai_technologies', 3, 'name',
+                     ('description', 'category', 'subcategory', 'platform_provider', 'use_cases',
+                      'hl_stearns_applications', 'notes')),
+    'tools': ('software_tools', 4, 'name',
+              ('description', 'category', 'vendor', 'tool_type')),
+    'research': ('research_items', 5, 'title',
+                 ('description', 'research_type', 'research_method', 'category', 'key_findings',
+                  'actionable_insights', 'tags', 'notes')),
+    'integrations': ('integrations', 6, 'name',
+                     ('platform', 'integration_type', 'purpose')),
+}
+
+SEARCH_TYPES_BY_TABLE = {table: search_type for search_type, (table, *_) in SEARCHABLE.items()}
+
+ROWID_STRIDE = 8
+SNIPPET_MARK = '**'
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# Set by ensure_search_index(); False until the FTS table and triggers exist
+_available = False
+
+CREATE_INDEX_SQL = (
+    "CREATE VIRTUAL TABLE search_index USING fts5("
+    "entity_type UNINDEXED, entity_id UNINDEXED, title, body, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+
+def _body_sql(alias, columns):
+    return " || ' ' || ".join(f"coalesce({alias}.{column}, '')" for column in columns)
+
+
+def _trigger_sql(search_type):
+    table, code, title, body = SEARCHABLE[search_type]
+    insert_new = (
+        f"INSERT INTO search_index(rowid, entity_type, entity_id, title, body) "
+        f"VALUES (new.id * {ROWID_STRIDE} + {code}, '{search_type}', new.id, "
+        f"coalesce(new.{title}, ''), {_body_sql('new', body)});"
+    )
+    delete_old = f"DELETE FROM search_index WHERE rowid = old.id * {ROWID_STRIDE} + {code};"
+    # Written as SQLite stores them in sqlite_master, so changes are detectable
+    return {
+        f"{table}_search_ai": f"CREATE TRIGGER {table}_search_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"{table}_search_au": f"CREATE TRIGGER {table}_search_au AFTER UPDATE ON {table} BEGIN {delete_old} {insert_new} END",
+        f"{table}_search_ad": f"CREATE TRIGGER {table}_search_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+    }
+
+
+def _backfill_sql(search_type):
+    table, code, title, body = SEARCHABLE[search_type]
+    return (
+        f"INSERT INTO search_index(rowid, entity_type, entity_id, title, body) "
+        f"SELECT t.id * {ROWID_STRIDE} + {code}, '{search_type}', t.id, "
+        f"coalesce(t.{title}, ''), {_body_sql('t', body)} FROM {table} t"
+    )
+
+
+def ensure_search_index():
+    """Create the FTS table and triggers, backfilling when first created.
+
+    Triggers that differ from SEARCHABLE (a column was added or dropped) are
+    replaced and the index is rebuilt from the tables. Returns False (and
+    search stays disabled) if SQLite lacks FTS5.
+    """
+    global _available
+    connection = db.session.connection()
+    exists = connection.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+    )).first()
+    expected = {}
+    for search_type in SEARCHABLE:
+        expected.update(_trigger_sql(search_type))
+    installed = {
+        name: sql for name, sql in connection.execute(text(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger'"
+        )) if name in expected
+    }
+    try:
+        if not exists:
+            connection.execute(text(CREATE_INDEX_SQL))
+            # Title matches weigh ten times body matches in the default rank
+            connection.execute(text(
+                "INSERT INTO search_index(search_index, rank) VALUES ('rank', 'bm25(0.0, 0.0, 10.0, 1.0)')"
+            ))
+        for name, statement in expected.items():
+            if installed.get(name) != statement:
+                if name in installed:
+                    connection.execute(text(f"DROP TRIGGER {name}"))
+                connection.execute(text(statement))
+        if exists and installed != expected:
+            logger.info("Search index definition changed; rebuilding")
+            connection.execute(text("DELETE FROM search_index"))
+        if not exists or installed != expected:
+            for search_type in SEARCHABLE:
+                connection.execute(text(_backfill_sql(search_type)))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.warning("Full-text search unavailable: %s", e)
+        _available = False
+        return False
+    _available = True
+    return True
+
+
+def indexed_columns(table):
+    """Every column of `table` whose text goes into the index"""
+    _, _, title, body = SEARCHABLE[SEARCH_TYPES_BY_TABLE[table]]
+    return (title,) + body
+
+
+def build_match_query(query):
+    """Turn free text into an FTS5 expression: every word quoted, prefix-matched"""
+    words = re.findall(r'\w+', query, re.UNICODE)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def matching_ids(table, query):
+    """Subquery of ids in `table` whose indexed text matches query.
+
+    Returns None if query has no words; raises KeyError for a table that is
+    not searchable and RuntimeError if the index was never built.
+    """
+    if not _available:
+        raise RuntimeError('Full-text search is unavailable')
+    match = build_match_query(query)
+    if not match:
+        return None
+    search_type = SEARCH_TYPES_BY_TABLE[table]
+    return text(
+        "SELECT entity_id FROM search_index WHERE search_index MATCH :match AND entity_type = :type"
+    ).bindparams(match=match, type=search_type).columns(entity_id=Integer)
+
+
+def search(query, search_type=None, limit=DEFAULT_LIMIT):
+    """Ranked search; returns (total, [{type, id, title, snippet, score}])"""
+    match = build_match_query(query)
+    if not match or not _available:
+        return 0, []
+
+    where = "search_index MATCH :match"
+    params = {'match': match, 'limit': max(1, min(limit, MAX_LIMIT))}
+    if search_type:
+        where += " AND entity_type = :type"
+        params['type'] = search_type
+
+    total = db.session.execute(text(f"SELECT count(*) FROM search_index WHERE {where}"), params).scalar()
+    rows = db.session.execute(text(
+        f"SELECT entity_type, entity_id, title, "
+        f"snippet(search_index, -1, '{SNIPPET_MARK}', '{SNIPPET_MARK}', '...', 12), rank "
+        f"FROM search_index WHERE {where} ORDER BY rank LIMIT :limit"
+    ), params)
+    results = [{
+        'type': entity_type,
+        'id': entity_id,
+        'title': title,
+        'snippet': snippet,
+        'score': -score  # bm25 is negative; higher is better for clients
+    } for entity_type, entity_id, title, snippet, score in rows]
+    return total, results
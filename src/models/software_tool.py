@@ -4,6 +4,11 @@ from datetime import datetime
 
 class SoftwareTool(db.Model):
     __tablename__ = 'software_tools'
+    __table_args__ = (
+        db.Index('ix_software_tools_category_evaluation_status', 'category', 'evaluation_status'),
+        db.Index('ix_software_tools_evaluation_status', 'evaluation_status'),
+        db.Index('ix_software_tools_updated_at', 'updated_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
@@ -1,8 +1,6 @@
 from flask import Blueprint, jsonify
 from src.routes.auth import require_admin
-from src.extensions import csrf
-import subprocess
-import os
+from src.backup_engine import backup_manager
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -10,39 +8,29 @@ admin_bp = Blueprint('admin', __name__)
 @require_admin
 
 def trigger_backup():
-    """Manually trigger database backup"""
+    """Manually trigger database backup (runs in the background)"""
     try:
-        # Get the project root directory (3 levels up from this file)
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-
-        result = subprocess.run(
-            ['python', 'backup_database.py'],
-            capture_output=True,
-            text=True,
-            timeout=30,
-            cwd=project_root
-        )
-
-        if result.returncode == 0:
-            return jsonify({
-                'success': True,
-                'message': 'Backup created successfully',
-                'output': result.stdout
-            })
-        else:
+        if not backup_manager.start():
             return jsonify({
                 'success': False,
-                'message': 'Backup failed',
-                'error': result.stderr
-            }), 500
+                'message': 'A backup is already in progress',
+                'backup': backup_manager.status
+            }), 409
 
-    except subprocess.TimeoutExpired:
         return jsonify({
-            'success': False,
-            'message': 'Backup timed out after 30 seconds'
-        }), 500
+            'success': True,
+            'message': 'Backup started',
+            'backup': backup_manager.status
+        }), 202
+
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f'Backup error: {str(e)}'
         }), 500
+
+@admin_bp.route('/api/admin/backup/status', methods=['GET'])
+@require_admin
+def backup_status():
+    """Report progress of the current or most recent backup"""
+    return jsonify(backup_manager.status)
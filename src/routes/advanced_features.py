@@ -1,33 +1,62 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, Response, stream_with_context, send_file, current_app, url_for
 from datetime import datetime, timedelta
-import json
-import csv
-import io
-import zipfile
 from collections import defaultdict
+from src.models.dashboard_aggregate import load_aggregates
+from src.models.search_index import SEARCHABLE, search
+from src.exports import EXPORT_FORMATS, resolve_types, iter_export, export_filename
+from src.export_jobs import submit_job, read_job, artifact_path, public_view
+from src.imports import IMPORT_TYPES, import_format, import_formats, submit_import
+from src.imports import read_job as read_import_job
+from src.routes.auth import require_auth, require_admin
+from src.security_headers import NO_STORE
 
 advanced_features_bp = Blueprint('advanced_features', __name__)
 
+# Open deliverables due within this many days count as at risk
+AT_RISK_WINDOW_DAYS = 7
+
+def _labelled(buckets):
+    """Aggregate buckets store NULL as ''; show it as 'Unspecified'"""
+    return {(bucket or 'Unspecified'): count for bucket, count in buckets.items()}
+
 @advanced_features_bp.route('/api/analytics/dashboard', methods=['GET'])
 def get_dashboard_analytics():
     """Get comprehensive dashboard analytics"""
-    # This would normally query your database
-    # For now, returning structured analytics data
-    
+    # Counters are maintained on every write (src/models/dashboard_aggregate.py),
+    # so this reads one small table regardless of how many rows exist
+    aggregates = load_aggregates()
+    deliverables_by_status = aggregates.get('deliverables_by_status', {})
+    processes_by_status = aggregates.get('processes_by_status', {})
+    technologies_by_status = aggregates.get('technologies_by_status', {})
+    research_by_status = aggregates.get('research_by_status', {})
+    integrations_by_status = aggregates.get('integrations_by_setup_status', {})
+
+    today = datetime.utcnow().date()
+    risk_horizon = (today + timedelta(days=AT_RISK_WINDOW_DAYS)).isoformat()
+    today = today.isoformat()
+    open_by_due_date = aggregates.get('open_deliverables_by_due_date', {})
+    overdue_items = sum(count for due, count in open_by_due_date.items() if due and due < today)
+    at_risk_items = sum(count for due, count in open_by_due_date.items() if due and today <= due < risk_horizon)
+    on_track_items = sum(open_by_due_date.values()) - overdue_items - at_risk_items
+
+    total_deliverables = sum(deliverables_by_status.values())
+    completed_deliverables = deliverables_by_status.get('Completed', 0)
+    total_technologies = sum(technologies_by_status.values())
+
     analytics = {
         'overview': {
-            'total_deliverables': 0,
-            'completed_deliverables': 0,
-            'total_processes': 0,
-            'automated_processes': 0,
-            'total_ai_technologies': 0,
-            'evaluated_technologies': 0,
-            'total_research_items': 0,
-            'completed_research': 0,
-            'project_completion': 0,
-            'on_track_items': 0,
-            'at_risk_items': 0,
-            'overdue_items': 0
+            'total_deliverables': total_deliverables,
+            'completed_deliverables': completed_deliverables,
+            'total_processes': sum(processes_by_status.values()),
+            'automated_processes': processes_by_status.get('Implemented', 0),
+            'total_ai_technologies': total_technologies,
+            'evaluated_technologies': total_technologies - technologies_by_status.get('Not Evaluated', 0),
+            'total_research_items': sum(research_by_status.values()),
+            'completed_research': research_by_status.get('Completed', 0),
+            'project_completion': round(100 * completed_deliverables / total_deliverables) if total_deliverables else 0,
+            'on_track_items': on_track_items,
+            'at_risk_items': at_risk_items,
+            'overdue_items': overdue_items
         },
         'trends': {
             'weekly_progress': [],
@@ -36,10 +65,10 @@ def get_dashboard_analytics():
             'technology_adoption': []
         },
         'distributions': {
-            'deliverables_by_phase': {},
-            'processes_by_department': {},
-            'technologies_by_category': {},
-            'research_by_type': {}
+            'deliverables_by_phase': _labelled(aggregates.get('deliverables_by_phase', {})),
+            'processes_by_department': _labelled(aggregates.get('processes_by_department', {})),
+            'technologies_by_category': _labelled(aggregates.get('technologies_by_category', {})),
+            'research_by_type': _labelled(aggregates.get('research_by_type', {}))
         },
         'priorities': {
             'high_priority_items': [],
@@ -55,10 +84,11 @@ def get_dashboard_analytics():
             'cost_benefit_breakdown': {}
         },
         'integration_status': {
-            'connected_platforms': 0,
-            'pending_integrations': 0,
-            'failed_integrations': 0,
-            'data_sync_health': 'Good'
+            'connected_platforms': integrations_by_status.get('Active', 0),
+            'pending_integrations': (integrations_by_status.get('Not Configured', 0)
+                                     + integrations_by_status.get('In Progress', 0)),
+            'failed_integrations': integrations_by_status.get('Error', 0),
+            'data_sync_health': 'Good' if not integrations_by_status.get('Error') else 'Degraded'
         }
     }
     
@@ -134,65 +164,114 @@ def generate_progress_report():
     return jsonify(report)
 
 @advanced_features_bp.route('/api/export/data', methods=['POST'])
+@require_auth
 def export_data():
     """Export data in various formats"""
-    data = request.get_json()
+    data = request.get_json() or {}
     export_format = data.get('format', 'json')
     export_type = data.get('type', 'all')
-    
-    # Collect data based on export type
-    export_data = {}
-    
-    if export_type in ['all', 'deliverables']:
-        export_data['deliverables'] = []  # Would fetch from database
-    
-    if export_type in ['all', 'processes']:
-        export_data['processes'] = []  # Would fetch from database
-    
-    if export_type in ['all', 'technologies']:
-        export_data['technologies'] = []  # Would fetch from database
-    
-    if export_type in ['all', 'research']:
-        export_data['research'] = []  # Would fetch from database
-    
-    # Generate export file based on format
-    if export_format == 'json':
-        output = io.StringIO()
-        json.dump(export_data, output, indent=2)
-        output.seek(0)
-        
-        return send_file(
-            io.BytesIO(output.getvalue().encode()),
-            mimetype='application/json',
-            as_attachment=True,
-            download_name=f'capstone_data_{datetime.now().strftime("%Y%m%d")}.json'
-        )
-    
-    elif export_format == 'csv':
-        # Create a zip file with multiple CSV files
-        zip_buffer = io.BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for data_type, items in export_data.items():
-                if items:
-                    csv_buffer = io.StringIO()
-                    if items:
-                        writer = csv.DictWriter(csv_buffer, fieldnames=items[0].keys())
-                        writer.writeheader()
-                        writer.writerows(items)
-                    
-                    zip_file.writestr(f'{data_type}.csv', csv_buffer.getvalue())
-        
-        zip_buffer.seek(0)
-        
-        return send_file(
-            zip_buffer,
-            mimetype='application/zip',
-            as_attachment=True,
-            download_name=f'capstone_data_{datetime.now().strftime("%Y%m%d")}.zip'
-        )
-    
-    return jsonify({'error': 'Unsupported export format'}), 400
+
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': 'Unsupported export format'}), 400
+
+    types = resolve_types(export_type)
+    if types is None:
+        return jsonify({'error': f'Unsupported export type: {export_type}'}), 400
+
+    # Streamed straight from the database cursor; nothing is buffered whole
+    response = Response(
+        stream_with_context(iter_export(export_format, types)),
+        mimetype=EXPORT_FORMATS[export_format][0]
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename={export_filename(export_format)}'
+    return response
+
+@advanced_features_bp.route('/api/export/jobs', methods=['POST'])
+@require_auth
+def create_export_job():
+    """Queue a background export and return its job id"""
+    data = request.get_json() or {}
+    export_format = data.get('format', 'json')
+    export_type = data.get('type', 'all')
+
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': 'Unsupported export format'}), 400
+
+    types = resolve_types(export_type)
+    if types is None:
+        return jsonify({'error': f'Unsupported export type: {export_type}'}), 400
+
+    job = submit_job(current_app._get_current_object(), export_format, export_type, types)
+    response = jsonify({
+        **public_view(job),
+        'status_url': url_for('advanced_features.get_export_job', job_id=job['job_id']),
+        'download_url': url_for('advanced_features.download_export_job', job_id=job['job_id'])
+    })
+    response.status_code = 202
+    response.headers['Location'] = url_for('advanced_features.get_export_job', job_id=job['job_id'])
+    return response
+
+@advanced_features_bp.route('/api/export/jobs/<job_id>', methods=['GET'])
+@require_auth
+def get_export_job(job_id):
+    """Report the status and progress of an export job"""
+    job = read_job(job_id)
+    if not job:
+        return jsonify({'error': 'Export job not found'}), 404
+    return jsonify(public_view(job))
+
+@advanced_features_bp.route('/api/export/jobs/<job_id>/download', methods=['GET'])
+@require_auth
+def download_export_job(job_id):
+    """Download a finished export; supports Range requests for resuming"""
+    job = read_job(job_id)
+    if not job:
+        return jsonify({'error': 'Export job not found'}), 404
+    if job['status'] != 'completed':
+        return jsonify({'error': 'Export not ready', 'status': job['status']}), 409
+
+    response = send_file(
+        artifact_path(job),
+        mimetype=EXPORT_FORMATS[job['format']][0],
+        as_attachment=True,
+        download_name=job['download_name'],
+        conditional=True
+    )
+    # conditional=True adds an ETag, which would otherwise leave only no-cache
+    response.headers['Cache-Control'] = NO_STORE
+    return response
+
+@advanced_features_bp.route('/api/import/jobs', methods=['POST'])
+@require_admin
+def create_import_job():
+    """Upload a CSV/XLSX file (form fields: file, type) and queue its import"""
+    # IMPORT_MAX_BYTES is enforced by init_imports() before CSRF reads the form
+    upload = request.files.get('file')
+    import_type = request.form.get('type', '')
+
+    if upload is None or not upload.filename:
+        return jsonify({'error': 'No file uploaded'}), 400
+    if import_type not in IMPORT_TYPES:
+        return jsonify({'error': f'Unsupported import type: {import_type}'}), 400
+    file_format = import_format(upload.filename)
+    if file_format is None:
+        return jsonify({'error': f"Unsupported file type; upload {' or '.join(import_formats())}"}), 400
+
+    job = submit_import(current_app._get_current_object(), upload, import_type, file_format)
+    status_url = url_for('advanced_features.get_import_job', job_id=job['job_id'])
+    response = jsonify({**job, 'status_url': status_url})
+    response.status_code = 202
+    response.headers['Location'] = status_url
+    return response
+
+@advanced_features_bp.route('/api/import/jobs/<job_id>', methods=['GET'])
+@require_admin
+def get_import_job(job_id):
+    """Report the progress and row errors of an import job"""
+    job = read_import_job(job_id)
+    if not job:
+        return jsonify({'error': 'Import job not found'}), 404
+    return jsonify(job)
 
 @advanced_features_bp.route('/api/integrations/notion/connect', methods=['POST'])
 def connect_notion():
@@ -383,25 +462,29 @@ def search_all_data():
     """Search across all data types"""
     query = request.args.get('q', '')
     data_type = request.args.get('type', 'all')
-    
-    # In a real implementation, this would search across all data
+    limit = request.args.get('limit', 20, type=int)
+
+    if data_type != 'all' and data_type not in SEARCHABLE:
+        return jsonify({'error': f'Unknown search type: {data_type}'}), 400
+
+    total, results = search(query, None if data_type == 'all' else data_type, limit)
+
+    results_by_type = {search_type: [] for search_type in SEARCHABLE}
+    for result in results:
+        results_by_type[result['type']].append(result)
+
     search_results = {
         'query': query,
-        'total_results': 0,
-        'results_by_type': {
-            'deliverables': [],
-            'processes': [],
-            'technologies': [],
-            'research': [],
-            'integrations': []
-        },
-        'suggestions': [
+        'total_results': total,
+        'results': results,
+        'results_by_type': results_by_type,
+        'suggestions': [] if total else [
             'Try searching for specific technology names',
             'Use process names for better results',
             'Search by department or category'
         ]
     }
-    
+
     return jsonify(search_results)
 
 @advanced_features_bp.route('/api/backup/create', methods=['POST'])
@@ -4,14 +4,24 @@ from src.models.ai_technology import AITechnology
 from src.models.database import db
 from src.routes.auth import require_admin
 from src.extensions import csrf
+from src.listing import list_response, item_response
+from src.bulk import bulk_response
 
 ai_technologies_bp = Blueprint('ai_technologies', __name__)
 
+# Indexed columns (see AITechnology.__table_args__) open to filter[...]
+TECHNOLOGY_FILTERS = ('category', 'evaluation_status')
+
 @ai_technologies_bp.route('/api/ai-technologies', methods=['GET'])
 def get_ai_technologies():
     """Get all AI technologies"""
-    technologies = AITechnology.query.all()
-    return jsonify([tech.to_dict() for tech in technologies])
+    return list_response(AITechnology, AITechnology.to_dict, filters=TECHNOLOGY_FILTERS)
+
+@ai_technologies_bp.route('/api/ai-technologies/bulk', methods=['POST', 'PUT', 'DELETE'])
+@require_admin
+def bulk_ai_technologies():
+    """Create, update or delete AI technologies in one transaction"""
+    return bulk_response(AITechnology)
 
 @ai_technologies_bp.route('/api/ai-technologies', methods=['POST'])
 @require_admin
@@ -57,6 +67,11 @@ def create_ai_technology():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@ai_technologies_bp.route('/api/ai-technologies/<int:tech_id>', methods=['GET'])
+def get_ai_technology(tech_id):
+    """Get a single AI technology"""
+    return item_response(AITechnology, tech_id, AITechnology.to_dict, 'AI technology not found')
+
 @ai_technologies_bp.route('/api/ai-technologies/<int:tech_id>', methods=['PUT'])
 @require_admin
 
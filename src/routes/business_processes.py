@@ -4,14 +4,24 @@ from src.models.business_process import BusinessProcess
 from src.models.database import db
 from src.routes.auth import require_admin
 from src.extensions import csrf
+from src.listing import list_response, item_response
+from src.bulk import bulk_response
 
 business_processes_bp = Blueprint('business_processes', __name__)
 
+# Indexed columns (see BusinessProcess.__table_args__) open to filter[...]
+PROCESS_FILTERS = ('department', 'evaluation_status', 'automation_potential')
+
 @business_processes_bp.route('/api/business-processes', methods=['GET'])
 def get_business_processes():
     """Get all business processes"""
-    processes = BusinessProcess.query.all()
-    return jsonify([p.to_dict() for p in processes])
+    return list_response(BusinessProcess, BusinessProcess.to_dict, filters=PROCESS_FILTERS)
+
+@business_processes_bp.route('/api/business-processes/bulk', methods=['POST', 'PUT', 'DELETE'])
+@require_admin
+def bulk_business_processes():
+    """Create, update or delete business processes in one transaction"""
+    return bulk_response(BusinessProcess)
 
 @business_processes_bp.route('/api/business-processes', methods=['POST'])
 @require_admin
@@ -48,6 +58,11 @@ def create_business_process():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@business_processes_bp.route('/api/business-processes/<int:process_id>', methods=['GET'])
+def get_business_process(process_id):
+    """Get a single business process"""
+    return item_response(BusinessProcess, process_id, BusinessProcess.to_dict, 'Business process not found')
+
 @business_processes_bp.route('/api/business-processes/<int:process_id>', methods=['PUT'])
 @require_admin
 
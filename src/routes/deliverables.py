@@ -4,14 +4,25 @@ from src.models.deliverable import Deliverable
 from src.models.database import db
 from src.routes.auth import require_admin
 from src.extensions import csrf
+from src.listing import list_response, item_response
+from src.bulk import bulk_response
 
 deliverables_bp = Blueprint('deliverables', __name__)
 
+# Indexed columns (see Deliverable.__table_args__) open to filter[...] and sort=
+DELIVERABLE_FILTERS = ('status', 'phase', 'due_date')
+DELIVERABLE_SORTS = ('due_date',)
+
 @deliverables_bp.route('/api/deliverables', methods=['GET'])
 def get_deliverables():
     """Get all deliverables"""
-    deliverables = Deliverable.query.all()
-    return jsonify([d.to_dict() for d in deliverables])
+    return list_response(Deliverable, Deliverable.to_dict, filters=DELIVERABLE_FILTERS, sorts=DELIVERABLE_SORTS)
+
+@deliverables_bp.route('/api/deliverables/bulk', methods=['POST', 'PUT', 'DELETE'])
+@require_admin
+def bulk_deliverables():
+    """Create, update or delete deliverables in one transaction"""
+    return bulk_response(Deliverable)
 
 @deliverables_bp.route('/api/deliverables', methods=['POST'])
 @require_admin
@@ -57,6 +68,11 @@ def create_deliverable():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@deliverables_bp.route('/api/deliverables/<int:deliverable_id>', methods=['GET'])
+def get_deliverable(deliverable_id):
+    """Get a single deliverable"""
+    return item_response(Deliverable, deliverable_id, Deliverable.to_dict, 'Deliverable not found')
+
 @deliverables_bp.route('/api/deliverables/<int:deliverable_id>', methods=['PUT'])
 @require_admin
 
@@ -2,16 +2,22 @@ from flask import Blueprint, request, jsonify
 from datetime import datetime
 from src.models.database import db
 from src.models.integration import Integration
-from src.routes.auth import require_admin
+from src.routes.auth import require_admin, require_auth
 from src.extensions import csrf
+from src.listing import list_response, item_response
+from src.bulk import bulk_response
 
 integrations_bp = Blueprint('integrations', __name__)
 
-@integrations_bp.route('/api/integrations', methods=['GET'])
-def get_integrations():
-    """Get all integrations"""
-    integrations = Integration.query.all()
-    return jsonify([{
+# Indexed columns (see Integration.__table_args__) open to filter[...]
+INTEGRATION_FILTERS = ('platform', 'setup_status')
+
+INTEGRATION_SUMMARY_COLUMNS = ('id', 'name', 'platform', 'integration_type', 'purpose',
+                               'setup_status', 'created_at', 'updated_at')
+
+def serialize_integration_summary(integration):
+    """List-view representation of an integration"""
+    return {
         'id': integration.id,
         'name': integration.name,
         'platform': integration.platform,
@@ -20,7 +26,18 @@ def get_integrations():
         'setup_status': integration.setup_status,
         'created_at': integration.created_at.isoformat() if integration.created_at else None,
         'updated_at': integration.updated_at.isoformat() if integration.updated_at else None
-    } for integration in integrations])
+    }
+
+@integrations_bp.route('/api/integrations', methods=['GET'])
+def get_integrations():
+    """Get all integrations"""
+    return list_response(Integration, serialize_integration_summary, columns=INTEGRATION_SUMMARY_COLUMNS, filters=INTEGRATION_FILTERS)
+
+@integrations_bp.route('/api/integrations/bulk', methods=['POST', 'PUT', 'DELETE'])
+@require_admin
+def bulk_integrations():
+    """Create, update or delete integrations in one transaction"""
+    return bulk_response(Integration)
 
 @integrations_bp.route('/api/integrations', methods=['POST'])
 @require_admin
@@ -61,6 +78,12 @@ def create_integration():
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
+@integrations_bp.route('/api/integrations/<int:integration_id>', methods=['GET'])
+@require_auth
+def get_integration(integration_id):
+    """Get a single integration with all fields"""
+    return item_response(Integration, integration_id, Integration.to_dict, 'Integration not found')
+
 @integrations_bp.route('/api/integrations/<int:integration_id>', methods=['PUT'])
 @require_admin
 
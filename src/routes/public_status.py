@@ -5,14 +5,23 @@ Read-only transparency dashboard showing recent build quality and system health.
 No authentication required - demonstrates quality publicly.
 """
 
-from flask import Blueprint, render_template, jsonify
+from flask import Blueprint, render_template, jsonify, request, Response
 from datetime import datetime, timedelta
 import json
 from pathlib import Path
-import subprocess
+from src.metrics import registry
+from src.version import resolve_version
 
 public_status_bp = Blueprint('public_status', __name__)
 
+# Resolved once at import (startup); status probes never fork git
+CURRENT_VERSION = resolve_version()
+
+TPA_HISTORY_PATH = Path(__file__).resolve().parents[2] / 'docs' / 'TPA_HISTORY.json'
+
+# (mtime_ns, size, builds) of the last parsed TPA_HISTORY.json
+_history_cache = (None, None, None)
+
 @public_status_bp.route('/status')
 def status_page():
     """Public status dashboard - last 5 builds + current health"""
@@ -33,29 +42,27 @@ def status_api():
         'recent_builds': get_recent_builds(limit=5),
         'quality_gates': get_quality_gate_status(),
         'last_incident': get_last_incident(),
-        'system_status': 'operational',  # 'operational', 'degraded', 'outage'
+        'system_status': get_system_status(),  # 'operational', 'degraded', 'outage'
     }
 
     return jsonify(status_data)
 
 def get_current_version():
-    """Get current deployed version from git"""
-    try:
-        result = subprocess.run(
-            ['git', 'describe', '--tags', '--abbrev=0'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        return result.stdout.strip() if result.returncode == 0 else 'unknown'
-    except Exception:
-        return 'unknown'
+    """Get current deployed version (resolved at startup)"""
+    return CURRENT_VERSION
 
 def get_health_score():
-    """Calculate current health score (simplified)"""
-    # In production, this would aggregate from TelemetryLite
-    # For now, return static or read from latest TPA run
-    return 98
+    """Current health score from live p95 latency and error rate (see src/metrics.py)"""
+    return registry.health()['score']
+
+def get_system_status():
+    """Map the health score to 'operational', 'degraded' or 'outage'"""
+    score = get_health_score()
+    if score >= 70:
+        return 'operational'
+    if score >= 40:
+        return 'degraded'
+    return 'outage'
 
 def get_uptime_days():
     """Calculate days since last incident"""
@@ -72,54 +79,73 @@ def get_recent_builds(limit=5):
     """
 
     # Try to load from TPA_HISTORY.json if it exists
-    history_json = Path('docs/TPA_HISTORY.json')
-    if history_json.exists():
-        with open(history_json, 'r') as f:
-            data = json.load(f)
-            return data.get('builds', [])[:limit]
+    builds = load_tpa_history()
+    if builds is not None:
+        return builds[:limit]
 
     # Fallback: Parse from markdown or return mock data
-    return [
-        {
-            'version': 'v0.36.4-tpa-foundation',
-            'date': '2025-01-04',
-            'status': 'passed',
-            'duration_seconds': 245,
-            'scores': {
-                'visual': 100,
-                'e2e': None,  # Not yet implemented
-                'security': 100,
-                'accessibility': None,
-                'performance': None,
-            }
-        },
-        {
-            'version': 'v0.36.4-ui-modern',
-            'date': '2025-01-04',
-            'status': 'passed',
-            'duration_seconds': 198,
-            'scores': {
-                'visual': 100,
-                'e2e': None,
-                'security': 100,
-                'accessibility': 95,
-                'performance': 92,
-            }
-        },
-        {
-            'version': 'v0.36.3-ui-delete-hotfix',
-            'date': '2025-01-04',
-            'status': 'passed',
-            'duration_seconds': 187,
-            'scores': {
-                'visual': 100,
-                'e2e': 100,
-                'security': 100,
-                'accessibility': 95,
-                'performance': 90,
-            }
-        },
-    ]
+    return FALLBACK_BUILDS[:limit]
+
+def load_tpa_history():
+    """Builds from TPA_HISTORY.json, re-parsed only when the file changes"""
+    global _history_cache
+    try:
+        stat = TPA_HISTORY_PATH.stat()
+    except OSError:
+        return None
+
+    mtime_ns, size, builds = _history_cache
+    if (mtime_ns, size) != (stat.st_mtime_ns, stat.st_size):
+        try:
+            with open(TPA_HISTORY_PATH, 'r') as f:
+                builds = json.load(f).get('builds', [])
+        except (OSError, ValueError):
+            return None
+        _history_cache = (stat.st_mtime_ns, stat.st_size, builds)
+    return builds
+
+# Shown until docs/TPA_HISTORY.json exists
+FALLBACK_BUILDS = [
+    {
+        'version': 'v0.36.4-tpa-foundation',
+        'date': '2025-01-04',
+        'status': 'passed',
+        'duration_seconds': 245,
+        'scores': {
+            'visual': 100,
+            'e2e': None,  # Not yet implemented
+            'security': 100,
+            'accessibility': None,
+            'performance': None,
+        }
+    },
+    {
+        'version': 'v0.36.4-ui-modern',
+        'date': '2025-01-04',
+        'status': 'passed',
+        'duration_seconds': 198,
+        'scores': {
+            'visual': 100,
+            'e2e': None,
+            'security': 100,
+            'accessibility': 95,
+            'performance': 92,
+        }
+    },
+    {
+        'version': 'v0.36.3-ui-delete-hotfix',
+        'date': '2025-01-04',
+        'status': 'passed',
+        'duration_seconds': 187,
+        'scores': {
+            'visual': 100,
+            'e2e': 100,
+            'security': 100,
+            'accessibility': 95,
+            'performance': 90,
+        }
+    },
+]
 
 def get_quality_gate_status():
     """Get current status of all quality gates"""
@@ -189,3 +215,17 @@ def uptime_check():
         'version': get_current_version(),
         'uptime': True,
     }), 200
+
+@public_status_bp.route('/api/public/metrics')
+def metrics_api():
+    """
+    Live request metrics (per-route counts, errors, latency histograms)
+    JSON by default; Prometheus text with ?format=prometheus or Accept: text/plain
+    """
+    preferred = request.accept_mimetypes.best or ''
+    wants_text = request.args.get('format') == 'prometheus' or preferred.startswith(
+        ('text/plain', 'application/openmetrics-text')
+    )
+    if wants_text:
+        return Response(registry.to_prometheus(), mimetype='text/plain; version=0.0.4')
+    return jsonify(registry.to_dict())
@@ -4,14 +4,24 @@ from src.models.research_item import ResearchItem
 from src.models.database import db
 from src.routes.auth import require_admin
 from src.extensions import csrf
+from src.listing import list_response, item_response
+from src.bulk import bulk_response
 
 research_items_bp = Blueprint('research_items', __name__)
 
+# Indexed columns (see ResearchItem.__table_args__) open to filter[...]
+RESEARCH_FILTERS = ('research_type', 'completion_status')
+
 @research_items_bp.route('/api/research-items', methods=['GET'])
 def get_research_items():
     """Get all research items"""
-    items = ResearchItem.query.all()
-    return jsonify([item.to_dict() for item in items])
+    return list_response(ResearchItem, ResearchItem.to_dict, filters=RESEARCH_FILTERS)
+
+@research_items_bp.route('/api/research-items/bulk', methods=['POST', 'PUT', 'DELETE'])
+@require_admin
+def bulk_research_items():
+    """Create, update or delete research items in one transaction"""
+    return bulk_response(ResearchItem)
 
 @research_items_bp.route('/api/research-items', methods=['POST'])
 @require_admin
@@ -51,6 +61,11 @@ def create_research_item():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@research_items_bp.route('/api/research-items/<int:item_id>', methods=['GET'])
+def get_research_item(item_id):
+    """Get a single research item"""
+    return item_response(ResearchItem, item_id, ResearchItem.to_dict, 'Research item not found')
+
 @research_items_bp.route('/api/research-items/<int:item_id>', methods=['PUT'])
 @require_admin
 
@@ -2,16 +2,22 @@ from flask import Blueprint, request, jsonify
 from datetime import datetime
 from src.models.software_tool import SoftwareTool
 from src.models.database import db
-from src.routes.auth import require_admin
+from src.routes.auth import require_admin, require_auth
 from src.extensions import csrf
+from src.listing import list_response, item_response
+from src.bulk import bulk_response
 
 software_tools_bp = Blueprint('software_tools', __name__)
 
-@software_tools_bp.route('/api/software-tools', methods=['GET'])
-def get_software_tools():
-    """Get all software tools"""
-    tools = SoftwareTool.query.all()
-    return jsonify([{
+# Indexed columns (see SoftwareTool.__table_args__) open to filter[...]
+TOOL_FILTERS = ('category', 'evaluation_status')
+
+TOOL_SUMMARY_COLUMNS = ('id', 'name', 'description', 'category', 'vendor', 'tool_type',
+                        'evaluation_status', 'created_at', 'updated_at')
+
+def serialize_tool_summary(tool):
+    """List-view representation of a software tool"""
+    return {
         'id': tool.id,
         'name': tool.name,
         'description': tool.description,
@@ -21,7 +27,18 @@ def get_software_tools():
         'evaluation_status': tool.evaluation_status,
         'created_at': tool.created_at.isoformat(),
         'updated_at': tool.updated_at.isoformat()
-    } for tool in tools])
+    }
+
+@software_tools_bp.route('/api/software-tools', methods=['GET'])
+def get_software_tools():
+    """Get all software tools"""
+    return list_response(SoftwareTool, serialize_tool_summary, columns=TOOL_SUMMARY_COLUMNS, filters=TOOL_FILTERS)
+
+@software_tools_bp.route('/api/software-tools/bulk', methods=['POST', 'PUT', 'DELETE'])
+@require_admin
+def bulk_software_tools():
+    """Create, update or delete software tools in one transaction"""
+    return bulk_response(SoftwareTool)
 
 @software_tools_bp.route('/api/software-tools', methods=['POST'])
 @require_admin
@@ -82,6 +99,12 @@ def create_software_tool():
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
+@software_tools_bp.route('/api/software-tools/<int:tool_id>', methods=['GET'])
+@require_auth
+def get_software_tool(tool_id):
+    """Get a single software tool with all fields"""
+    return item_response(SoftwareTool, tool_id, SoftwareTool.to_dict, 'Software tool not found')
+
 @software_tools_bp.route('/api/software-tools/<int:tool_id>', methods=['PUT'])
 @require_admin
 
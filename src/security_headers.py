@@ -0,0 +1,96 @@
+"""
+Security header policies, built once at startup
+
+Each route class (HTML pages, static or fingerprinted immutable files, API
+responses) gets a complete
+header dict computed when the app starts; after_request applies it with one
+bulk update. A template that calls csp_nonce() gets a per-request nonce
+spliced into a pre-split CSP, so no policy string is rebuilt per response.
+"""
+
+import secrets
+from flask import g, request
+
+NO_STORE = 'no-store, no-cache, must-revalidate, private'
+# Fingerprinted assets (see src/static_assets.py) never change under a URL
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+
+# CSP for pages: allow unsafe-inline for styles (Bootstrap), strict script-src
+PAGE_CSP_DIRECTIVES = {
+    'default-src': "'self'",
+    'img-src': "'self' data: https:",
+    'style-src': "'self' 'unsafe-inline' https://cdnjs.cloudflare.com",
+    'script-src': "'self' https://cdnjs.cloudflare.com",
+    'font-src': "'self' data: https://cdnjs.cloudflare.com",
+    'connect-src': "'self'",
+    'object-src': "'none'",
+    'frame-ancestors': "'none'",
+    'report-uri': '/csp-report',
+}
+
+# JSON is never rendered, so API responses may load nothing at all
+API_CSP_DIRECTIVES = {
+    'default-src': "'none'",
+    'frame-ancestors': "'none'",
+}
+
+BASE_HEADERS = {
+    'X-Robots-Tag': 'noindex, nofollow',
+    'X-Content-Type-Options': 'nosniff',
+    'X-Frame-Options': 'DENY',
+    'X-XSS-Protection': '1; mode=block',
+}
+
+_NONCE_SLOT = '\x00nonce\x00'
+
+
+def build_csp(directives):
+    return '; '.join(f'{name} {value}' for name, value in directives.items())
+
+
+def csp_nonce():
+    """Nonce for this request's inline scripts: <script nonce="{{ csp_nonce() }}">"""
+    nonce = g.get('csp_nonce')
+    if nonce is None:
+        nonce = g.csp_nonce = secrets.token_urlsafe(16)
+    return nonce
+
+
+class HeaderPolicies:
+    """Precomputed header sets per route class"""
+
+    def __init__(self, page_csp=PAGE_CSP_DIRECTIVES, api_csp=API_CSP_DIRECTIVES, base=BASE_HEADERS):
+        page = {**base, 'Content-Security-Policy': build_csp(page_csp)}
+        api = {**base, 'Content-Security-Policy': build_csp(api_csp)}
+
+        self.html = {**page, 'Cache-Control': NO_STORE}
+        self.static = {**page, 'Cache-Control': NO_STORE}
+        self.immutable = {**page, 'Cache-Control': IMMUTABLE_CACHE}
+        self.api = {**api, 'Cache-Control': NO_STORE}
+        # ETag'd API responses (see src/listing.py) keep their own Cache-Control
+        self.api_revalidate = dict(api)
+
+        with_nonce = dict(page_csp)
+        with_nonce['script-src'] = f"{page_csp['script-src']} 'nonce-{_NONCE_SLOT}'"
+        self._nonce_csp = tuple(build_csp(with_nonce).split(_NONCE_SLOT))
+
+    def policy_for(self, response):
+        # Path first: a bodiless 304 from an API route still defaults to text/html
+        if request.path.startswith('/api/') or response.is_json:
+            return self.api_revalidate if response.headers.get('ETag') else self.api
+        if response.mimetype == 'text/html':
+            return self.html
+        return self.immutable if response.cache_control.immutable else self.static
+
+    def apply(self, response):
+        policy = self.policy_for(response)
+        response.headers.update(policy)
+        if policy is self.html:
+            nonce = g.get('csp_nonce')
+            if nonce:
+                head, tail = self._nonce_csp
+                response.headers['Content-Security-Policy'] = head + nonce + tail
+        return response
+
+
+header_policies = HeaderPolicies()
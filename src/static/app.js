@@ -124,10 +124,17 @@ class CapstoneHub {
         }
     }
 
-    async loadDeliverables() {
+    // Collection URL with server-side filter[...] / q= parameters
+    listUrl(path, params) {
+        const query = params ? params.toString() : '';
+        return query ? path + '?' + query : path;
+    }
+
+    async loadDeliverables(params) {
         try {
-            console.log('[DEBUG] Fetching deliverables from /api/deliverables');
-            const response = await fetch('/api/deliverables');
+            const url = this.listUrl('/api/deliverables', params);
+            console.log('[DEBUG] Fetching deliverables from', url);
+            const response = await fetch(url);
             console.log('[DEBUG] Deliverables response status:', response.status, response.statusText);
             if (response.ok) {
                 this.data.deliverables = await response.json();
@@ -144,10 +151,11 @@ class CapstoneHub {
         }
     }
 
-    async loadProcesses() {
+    async loadProcesses(params) {
         try {
-            console.log('[DEBUG] Fetching business processes from /api/business-processes');
-            const response = await fetch('/api/business-processes');
+            const url = this.listUrl('/api/business-processes', params);
+            console.log('[DEBUG] Fetching business processes from', url);
+            const response = await fetch(url);
             console.log('[DEBUG] Business processes response status:', response.status, response.statusText);
             if (response.ok) {
                 this.data.processes = await response.json();
@@ -164,9 +172,9 @@ class CapstoneHub {
         }
     }
 
-    async loadAITechnologies() {
+    async loadAITechnologies(params) {
         try {
-            const response = await fetch('/api/ai-technologies');
+            const response = await fetch(this.listUrl('/api/ai-technologies', params));
             if (response.ok) {
                 this.data.aiTechnologies = await response.json();
                 this.renderAITechnologies();
@@ -192,10 +200,11 @@ class CapstoneHub {
         }
     }
 
-    async loadResearchItems() {
+    async loadResearchItems(params) {
         try {
-            console.log('[DEBUG] Fetching research items from /api/research-items');
-            const response = await fetch('/api/research-items');
+            const url = this.listUrl('/api/research-items', params);
+            console.log('[DEBUG] Fetching research items from', url);
+            const response = await fetch(url);
             console.log('[DEBUG] Research items response status:', response.status, response.statusText);
             if (response.ok) {
                 this.data.researchItems = await response.json();
@@ -484,30 +493,53 @@ class CapstoneHub {
         }).join('');
     }
 
-    // Filtering Methods
+    // Filtering Methods: the server filters, so only matching rows are transferred
     filterDeliverables() {
+        const params = new URLSearchParams();
         const phaseFilter = document.getElementById('phase-filter').value;
         const statusFilter = document.getElementById('status-filter').value;
-        // Apply filters and re-render
-        this.renderDeliverables();
+        if (phaseFilter) params.append('filter[phase]', phaseFilter);
+        if (statusFilter === 'Overdue') {
+            // Derived, not stored: past due and not yet completed
+            const now = new Date();
+            const today = [
+                now.getFullYear(),
+                String(now.getMonth() + 1).padStart(2, '0'),
+                String(now.getDate()).padStart(2, '0')
+            ].join('-');
+            params.append('filter[status][ne]', 'Completed');
+            params.append('filter[due_date][lt]', today);
+        } else if (statusFilter) {
+            params.append('filter[status]', statusFilter);
+        }
+        this.loadDeliverables(params);
     }
 
     filterProcesses() {
-        const searchTerm = document.getElementById('process-search').value.toLowerCase();
-        const departmentFilter = document.getElementById('department-filter').value;
-        const automationFilter = document.getElementById('automation-filter').value;
-        // Apply filters and re-render
-        this.renderProcesses();
+        // Debounced: the search box fires on every keystroke
+        clearTimeout(this.processFilterTimer);
+        this.processFilterTimer = setTimeout(() => {
+            const params = new URLSearchParams();
+            const searchTerm = document.getElementById('process-search').value.trim();
+            const departmentFilter = document.getElementById('department-filter').value;
+            const automationFilter = document.getElementById('automation-filter').value;
+            if (searchTerm) params.append('q', searchTerm);
+            if (departmentFilter) params.append('filter[department]', departmentFilter);
+            if (automationFilter) params.append('filter[automation_potential]', automationFilter);
+            this.loadProcesses(params);
+        }, 250);
     }
 
     filterAITechnologies(category) {
-        // Filter AI technologies by category and re-render
-        this.renderAITechnologies();
+        const params = new URLSearchParams();
+        if (category && category !== 'all') params.append('filter[category]', category);
+        this.loadAITechnologies(params);
     }
 
     filterResearch(type) {
-        // Filter research items by type and re-render
-        this.renderResearchItems();
+        const params = new URLSearchParams();
+        if (type === 'Primary' || type === 'Secondary') params.append('filter[research_type]', type);
+        this.loadResearchItems(params);
     }
 
     // Modal Management
@@ -0,0 +1,241 @@
+"""
+Static asset pipeline: content-hashed URLs for long-lived caching
+
+At startup every asset under the static folder gets a fingerprinted alias
+(app.js -> app.<hash>.js) and the HTML pages are rewritten in memory to
+reference those aliases. A changed file gets a new URL, so hashed assets
+can be served as immutable for a year while HTML stays no-store.
+
+Text assets are also precompressed into .gz (and .br, with brotli installed)
+siblings, and the variant matching Accept-Encoding is served.
+
+The whole folder is indexed into an in-memory manifest, and files up to
+MEMORY_MAX_SIZE (with their compressed variants) are held in memory with a
+precomputed ETag, so the SPA shell, deep links and hot assets are served
+without touching the filesystem. With watch=True (dev) the manifest is
+rebuilt when anything in the folder changes.
+"""
+
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from flask import Response, request, send_from_directory
+from src.compression import ENCODING_SUFFIXES, choose_encoding, compress, supported_encodings
+from src.security_headers import IMMUTABLE_CACHE
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_EXTENSIONS = {
+    '.js', '.css', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.webp',
+    '.woff', '.woff2', '.ttf',
+}
+HASH_LENGTH = 10
+
+PRECOMPRESS_EXTENSIONS = {'.js', '.css', '.html', '.svg', '.json', '.txt', '.ico', '.map', '.xml'}
+PRECOMPRESS_MIN_SIZE = 1024
+
+# Files up to this size are served from memory
+MEMORY_MAX_SIZE = int(os.environ.get('STATIC_MEMORY_MAX_SIZE', str(256 * 1024)))
+# Minimum seconds between change scans when watching (dev mode)
+WATCH_INTERVAL_SECONDS = 1.0
+# Generated files that must not trigger a rebuild when watching
+_GENERATED_SUFFIXES = tuple(ENCODING_SUFFIXES.values()) + ('.tmp',)
+
+# src="..." / href="..." with an optional cache-busting query string
+_REFERENCE = re.compile(r'\b(?P<attr>src|href)="(?P<url>[^"?#]+)(?:\?[^"#]*)?"')
+
+
+def fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def precompress(path):
+    """Write or refresh compressed siblings of path; returns {encoding: sibling name}.
+
+    A variant is kept only if it is smaller than the original.
+    """
+    path = Path(path)
+    if path.suffix not in PRECOMPRESS_EXTENSIONS or path.stat().st_size < PRECOMPRESS_MIN_SIZE:
+        return {}
+
+    variants = {}
+    data = None
+    for encoding in supported_encodings():
+        sibling = path.with_name(path.name + ENCODING_SUFFIXES[encoding])
+        try:
+            if not sibling.exists() or sibling.stat().st_mtime < path.stat().st_mtime:
+                data = data if data is not None else path.read_bytes()
+                tmp = sibling.with_name(sibling.name + '.tmp')
+                tmp.write_bytes(compress(data, encoding))
+                os.replace(tmp, sibling)
+            if sibling.stat().st_size < path.stat().st_size:
+                variants[encoding] = sibling.name
+        except OSError as e:
+            logger.warning("Could not precompress %s (%s): %s", path.name, encoding, e)
+    return variants
+
+
+def _etag(body):
+    return hashlib.sha256(body).hexdigest()[:20]
+
+
+class StaticFile:
+    """Manifest entry; bodies/etags are keyed by encoding (None = identity)"""
+
+    __slots__ = ('name', 'mimetype', 'last_modified', 'variants', 'bodies', 'etags')
+
+    def __init__(self, name, mimetype, last_modified, variants, bodies=None):
+        self.name = name
+        self.mimetype = mimetype
+        self.last_modified = last_modified
+        self.variants = variants    # {'gzip': 'css/theme.css.gz', ...}
+        self.bodies = bodies        # None when too large to keep in memory
+        self.etags = {encoding: _etag(body) for encoding, body in (bodies or {}).items()}
+
+
+class StaticAssets:
+    """Hashed-name manifest and rewritten HTML pages for one static folder"""
+
+    def __init__(self, static_folder, watch=False):
+        self.static_folder = Path(static_folder)
+        self.watch = watch
+        self.files = {}     # 'css/theme.css' -> StaticFile
+        self.urls = {}      # 'css/theme.css' -> 'css/theme.<hash>.css'
+        self.hashed = {}    # 'css/theme.<hash>.css' -> 'css/theme.css'
+        self.pages = {}     # 'index.html' -> StaticFile of the rewritten page
+        self._signature = None
+        self._checked_at = 0.0
+        self.build()
+
+    def _scan_signature(self):
+        """(name, mtime, size) of every source file, for change detection"""
+        signature = []
+        for directory, _, names in os.walk(self.static_folder):
+            for name in names:
+                if not name.endswith(_GENERATED_SUFFIXES):
+                    stat = os.stat(os.path.join(directory, name))
+                    signature.append((directory, name, stat.st_mtime_ns, stat.st_size))
+        return sorted(signature)
+
+    def refresh_if_changed(self):
+        """Rebuild when watching and the folder changed (rate limited)"""
+        if not self.watch or time.monotonic() - self._checked_at < WATCH_INTERVAL_SECONDS:
+            return False
+        self._checked_at = time.monotonic()
+        if self._scan_signature() == self._signature:
+            return False
+        logger.info("Static folder changed; rebuilding asset manifest")
+        self.build()
+        return True
+
+    def build(self):
+        signature = self._scan_signature()
+        files = {}
+        urls = {}
+        for path in sorted(self.static_folder.rglob('*')):
+            if not path.is_file() or path.name.endswith(_GENERATED_SUFFIXES):
+                continue
+            name = path.relative_to(self.static_folder).as_posix()
+            stat = path.stat()
+            data = path.read_bytes() if stat.st_size <= MEMORY_MAX_SIZE or path.suffix in FINGERPRINT_EXTENSIONS else None
+            if path.suffix in FINGERPRINT_EXTENSIONS:
+                urls[name] = f'{name[:-len(path.suffix)]}.{fingerprint(data)}{path.suffix}'
+            variants = {}
+            if path.suffix != '.html':
+                variants = {encoding: name + ENCODING_SUFFIXES[encoding] for encoding in precompress(path)}
+            bodies = None
+            if stat.st_size <= MEMORY_MAX_SIZE:
+                bodies = {None: data}
+                for encoding, sibling in variants.items():
+                    bodies[encoding] = (self.static_folder / sibling).read_bytes()
+            files[name] = StaticFile(
+                name,
+                mimetypes.guess_type(name)[0] or 'application/octet-stream',
+                datetime.fromtimestamp(int(stat.st_mtime), timezone.utc),
+                variants,
+                bodies
+            )
+
+        self.files = files
+        self.urls = urls
+        self.hashed = {hashed: name for name, hashed in urls.items()}
+        self.pages = {name: self._rewritten_page(entry) for name, entry in files.items()
+                      if '/' not in name and name.endswith('.html') and entry.bodies}
+        self._signature = signature
+        self._checked_at = time.monotonic()
+
+    def _rewritten_page(self, entry):
+        """Rewritten pages exist only in memory, so compress them in memory"""
+        body = self.rewrite(entry.bodies[None].decode('utf-8')).encode('utf-8')
+        bodies = {None: body}
+        if len(body) >= PRECOMPRESS_MIN_SIZE:
+            for encoding in supported_encodings():
+                bodies[encoding] = compress(body, encoding)
+        return StaticFile(entry.name, 'text/html', entry.last_modified, {}, bodies)
+
+    def rewrite(self, html):
+        """Point local src/href references at root-absolute hashed URLs"""
+
+        def replace(match):
+            url = match.group('url')
+            if '://' in url or url.startswith(('//', 'data:', 'mailto:')):
+                return match.group(0)
+            hashed = self.urls.get(url.lstrip('/').removeprefix('./'))
+            if hashed is None:
+                return match.group(0)
+            return f'{match.group("attr")}="/{hashed}"'
+
+        return _REFERENCE.sub(replace, html)
+
+    @staticmethod
+    def _memory_response(entry, max_age=None):
+        encoding = choose_encoding(entry.bodies)
+        response = Response(entry.bodies[encoding], mimetype=entry.mimetype)
+        response.set_etag(entry.etags[encoding])
+        response.last_modified = entry.last_modified
+        if max_age is not None:
+            response.cache_control.max_age = max_age
+        if len(entry.bodies) > 1:
+            response.vary.add('Accept-Encoding')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response.make_conditional(request)
+
+    def page_response(self, name):
+        return self._memory_response(self.pages[name])
+
+    def file_response(self, name, max_age=None):
+        """Send a static file, from memory when resident, else from disk.
+
+        A precompressed variant is picked when the client accepts it.
+        """
+        entry = self.files[name]
+        if entry.bodies is not None:
+            return self._memory_response(entry, max_age)
+
+        encoding = choose_encoding(entry.variants)
+        if encoding is None:
+            response = send_from_directory(self.static_folder, name, max_age=max_age)
+        else:
+            # The sibling's own extension would give it a gzip/brotli mimetype
+            response = send_from_directory(
+                self.static_folder, entry.variants[encoding], max_age=max_age, mimetype=entry.mimetype
+            )
+            response.headers['Content-Encoding'] = encoding
+        if entry.variants:
+            response.vary.add('Accept-Encoding')
+        return response
+
+    def hashed_response(self, path):
+        """Serve a fingerprinted alias as immutable, or None if not one"""
+        name = self.hashed.get(path)
+        if name is None:
+            return None
+        response = self.file_response(name, max_age=31536000)
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE
+        return response
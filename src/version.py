@@ -2,6 +2,10 @@
 Capstone Hub Version Information
 """
 
+import os
+import subprocess
+from pathlib import Path
+
 __version__ = "0.36.0"
 __release_date__ = "2025-10-04"
 __release_name__ = "Phase 1 Security"
@@ -21,3 +25,26 @@ VERSION_INFO = {
         "Strict CSP maintained (event delegation only)"
     ]
 }
+
+
+def resolve_version():
+    """Deployed version: APP_VERSION build stamp, else latest git tag, else __version__.
+
+    Meant to be called once at startup, not per request.
+    """
+    stamped = os.environ.get('APP_VERSION')
+    if stamped:
+        return stamped
+    try:
+        result = subprocess.run(
+            ['git', 'describe', '--tags', '--abbrev=0'],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            cwd=Path(__file__).parent
+        )
+        if result.returncode == 0 and result.stdout.strip():
+            return result.stdout.strip()
+    except Exception:
+        pass
+    return f'v{__version__}'